@@ -14,6 +14,9 @@ from services.arxiv_service import ArxivService
 from services.pubmed_service import PubMedService
 from services.scholar_service import ScholarService
 from services.deep_crawler import DeepPDFCrawler
+from services.challenge_queue import ChallengeQueue, KIND_SCHOLAR
+from services.metadata_resolver import MetadataResolver
+from services.screening_service import ScreeningService, METHODS as SCREENING_METHODS
 
 from services.downloader_service import DownloaderService
 from services.pdf_processor import PDFProcessor
@@ -31,13 +34,21 @@ def get_services():
     
     # Lazy initialization of services to handle reloads/updates
 
-    if 'arxiv' not in services: services['arxiv'] = ArxivService()
-    if 'pubmed' not in services: services['pubmed'] = PubMedService()
-    if 'scholar' not in services: services['scholar'] = ScholarService()
-    if 'deep_crawler' not in services: services['deep_crawler'] = DeepPDFCrawler()
+    if 'arxiv' not in services or not hasattr(services['arxiv'], 'download_to_store'):
+        services['arxiv'] = ArxivService()
+    if 'pubmed' not in services or not hasattr(services['pubmed'], 'resolve_pmc'):
+        services['pubmed'] = PubMedService()
+    # One shared queue instance: it is backed by a single JSON file
+    if 'challenge_queue' not in services: services['challenge_queue'] = ChallengeQueue()
+    if 'metadata' not in services: services['metadata'] = MetadataResolver()
+    if 'scholar' not in services or not hasattr(services['scholar'], 'search_cache'):
+        services['scholar'] = ScholarService(challenge_queue=services['challenge_queue'],
+                                             metadata_resolver=services['metadata'])
+    if 'deep_crawler' not in services or not hasattr(services['deep_crawler'], 'find_pdf'):
+        services['deep_crawler'] = DeepPDFCrawler()
     
     # Check if downloader is stale (missing new method)
-    if 'downloader' in services and not hasattr(services['downloader'], 'download_from_url'):
+    if 'downloader' in services and not hasattr(services['downloader'], 'download_many'):
         print("🔄 Updating stale DownloaderService...")
         services['downloader'] = DownloaderService(Config.DOWNLOAD_DIR)
     elif 'downloader' not in services:
@@ -45,9 +56,122 @@ def get_services():
 
     if 'pdf_processor' not in services: services['pdf_processor'] = PDFProcessor()
     if 'analyzer' not in services: services['analyzer'] = AnalyzerService()
+    if 'screening' not in services: services['screening'] = ScreeningService(analyzer=services['analyzer'])
 
     return services
 
+def build_download_strategies(services):
+    """
+    Ordered download strategies for a search result:
+    ArXiv library -> PMC open access -> direct PDF_Link -> deep page crawl -> DOI.
+    Each returns a result dict, or None when it does not apply to the paper.
+    """
+    downloader = services['downloader']
+    base = dict(downloader.default_strategies())
+
+    def try_arxiv(paper):
+        # SPECIAL CASE: ArXiv (Use library as requested)
+        if "ArXiv" not in paper.get('Source', ''):
+            return None
+        # Unique .part file per download, then into the PDF store: concurrent hits never collide
+        return services['arxiv'].download_to_store(paper, downloader)
+
+    def try_pmc(paper):
+        # PubMed Central open-access subset: PDF or JATS full text straight from NCBI
+        pmcid = paper.get('PMCID')
+        if not pmcid:
+            return None
+        location = services['pubmed'].resolve_pmc(pmcid)
+        if location is None:
+            return {"success": False, "filepath": None, "message": f"{pmcid} is not in the PMC open-access subset",
+                    "source": "PMC OA", "reason": "not_found"}
+        if location.get('pdf_url'):
+            res = downloader.download_from_url(location['pdf_url'], paper.get('Title', 'Unknown'), paper=paper)
+            if res['success']:
+                res['source'] = "PMC OA"
+                return res
+        # No PDF in the OA package (or it failed): the structured XML body is enough for analysis
+        try:
+            xml_path = services['pubmed'].fetch_pmc_xml(pmcid, os.path.join(Config.DOWNLOAD_DIR, f".{pmcid}.xml"))
+        except Exception as e:
+            return {"success": False, "filepath": None, "message": f"PMC XML Error: {e}", "source": "PMC OA"}
+        if not xml_path:
+            return {"success": False, "filepath": None, "message": f"No full-text body for {pmcid}",
+                    "source": "PMC OA", "reason": "not_found"}
+        return downloader.ingest_file(xml_path, paper, "PMC OA (XML)")
+
+    def try_deep_crawl(paper):
+        url = paper.get('URL')
+        if not url or not url.startswith('http') or paper.get('Crawled'):
+            return None
+        known = downloader.negative_cache.check("deep_crawl", url)
+        if known:
+            return downloader.negative_cache.skipped_result(known, "Deep Crawl")
+        # Never wait on a CAPTCHA here: challenged pages go to the "needs human" queue
+        res, status = crawl_and_download(services, paper, url)
+        if status == "challenge":
+            services['challenge_queue'].add(url, paper=paper)
+        elif status == "not_found":
+            downloader.negative_cache.record("deep_crawl", url, res)
+        return res
+
+    return [
+        ("arxiv", try_arxiv),
+        ("pmc", try_pmc),
+        ("direct", base["direct"]),
+        ("deep_crawl", try_deep_crawl),
+        ("doi", base["doi"]),
+    ]
+
+def crawl_and_download(services, paper, url, interactive=False, sound_alert=False):
+    """
+    Deep-crawl a landing page and download the PDF it links to.
+    Returns (result dict, crawl status) with status in 'found', 'not_found', 'challenge', 'error'.
+    """
+    downloader = services['downloader']
+    crawler = services['deep_crawler']
+    # PDFs found in the browser are captured in that session (cookies, Cloudflare clearance)
+    found_pdf, captured, status = crawler.find_pdf(url, Config.DOWNLOAD_DIR, interactive=interactive,
+                                                   sound_alert=sound_alert, doi=paper.get('DOI'))
+    if captured:
+        return downloader.ingest_file(captured, paper, "Deep Crawl", urls=[url, found_pdf]), status
+    if not found_pdf:
+        message = "Page is behind a CAPTCHA/challenge" if status == "challenge" else "Deep crawl found no PDF link"
+        reason = "challenge" if status == "challenge" else "not_found"
+        return {"success": False, "filepath": None, "message": message, "source": "Deep Crawl", "reason": reason}, status
+    res = downloader.download_from_url(found_pdf, paper.get('Title', 'Unknown'), paper=paper)
+    if res['success']:
+        res['source'] = "Deep Crawl"
+    elif not res.get('reason') == "stalled":
+        # The resolved link is dead: forget it so the next run crawls again
+        crawler.cache.invalidate(url=url, doi=paper.get('DOI'), pdf_url=found_pdf)
+    return res, status
+
+def resolve_challenge(services, item, sound_alert=False):
+    """
+    Operator-driven retry of a parked "needs human" item in a visible browser.
+    Crawl items are downloaded; Scholar items resume the search and download its results.
+    Returns a list of result dicts (empty when the challenge is still unsolved).
+    """
+    queue = services['challenge_queue']
+    if item['kind'] == KIND_SCHOLAR:
+        ctx = item.get('context', {})
+        # A still-unsolved CAPTCHA re-parks the search at its new offset
+        queue.remove(item['url'], kind=KIND_SCHOLAR)
+        papers = services['scholar'].iter_papers(ctx.get('query', ''), limit=ctx.get('limit', 10),
+                                                 start=ctx.get('start', 0))
+        strategies = build_download_strategies(services)
+        return services['downloader'].download_many(
+            papers, download_fn=lambda p: services['downloader'].download_paper(p, strategies))
+
+    paper = item.get('paper') or {"Title": item['url'], "URL": item['url']}
+    res, status = crawl_and_download(services, paper, item['url'], interactive=True, sound_alert=sound_alert)
+    if status == "challenge":
+        queue.add(item['url'], paper=paper)
+        return []
+    queue.remove(item['url'])
+    return [res]
+
 def run_analysis(files_to_process, fields, services, model_name, provider="openai"):
     results = []
     progress_bar = st.progress(0)
@@ -127,30 +251,106 @@ def main():
         
         query = st.text_area("Search Query", height=100, placeholder=query_placeholder)
         limit = st.number_input("Max Papers to Download", min_value=1, max_value=1000, value=5)
+        force_refresh = st.checkbox("🔄 Refresh search results", value=False, help="Results of a query are cached (SEARCH_CACHE_TTL). Check to query the source again instead of reusing them.")
+
+        # Relevance screening on titles/abstracts, before anything is downloaded
+        screen_on = st.checkbox("🎯 Screen results before downloading", value=False, help="Score every hit from its title and abstract and skip (or download last) the ones below the threshold. The whole search runs first, then downloads start.")
+        if screen_on:
+            col_crit, col_method, col_thr = st.columns([3, 1, 1])
+            with col_crit:
+                screen_criteria = st.text_input("Screening criteria", placeholder="Defaults to the search query")
+            with col_method:
+                screen_method = st.selectbox("Method", SCREENING_METHODS,
+                                             index=SCREENING_METHODS.index(Config.SCREENING_METHOD) if Config.SCREENING_METHOD in SCREENING_METHODS else 0,
+                                             help="keywords / tfidf run locally; llm sends one batched call per few dozen papers")
+            with col_thr:
+                screen_threshold = st.slider("Min relevance", 0.0, 1.0, float(Config.SCREENING_THRESHOLD), 0.05)
+            screen_drop = st.radio("Below the threshold", ["Skip", "Download last"], horizontal=True) == "Skip"
+            screen_provider, screen_model = "openai", "gpt-4o-mini"
+            if screen_method == "llm":
+                col_prov, col_model = st.columns(2)
+                with col_prov:
+                    screen_provider = st.radio("Screening LLM", ["openai", "ollama"], horizontal=True)
+                with col_model:
+                    screen_model = st.text_input("Screening model", value="gpt-4o-mini" if screen_provider == "openai" else "gemma3:1b")
         
         # Interactive Mode Toggle
         col_inter, col_sound = st.columns([3, 1])
         with col_inter:
-            interactive_mode = st.checkbox("🙋‍♂️ Interactive Mode (I am present to solve CAPTCHAs)", value=True, help="If checked, the system will pause and wait for you when it detects a CAPTCHA or Cloudflare block.")
+            interactive_mode = st.checkbox("🙋‍♂️ Interactive Mode (I am present to solve CAPTCHAs)", value=True, help="If checked, downloads start while results are still arriving and landing pages are crawled one by one as each paper is downloaded. If unchecked (unattended), the search completes first and all landing pages are resolved up front in a headless parallel batch. Either way, pages behind a CAPTCHA or Cloudflare block never stall the batch: they are parked in the 'Needs human' queue below for you to solve when convenient.")
         with col_sound:
             sound_alert = st.checkbox("🔔 Sound Alert", value=False, help="Play a sound when a CAPTCHA is detected.")
         
+        with st.expander("📊 Download strategy stats"):
+            st.caption("Strategies are reordered per publisher domain from these numbers.")
+            st.json(services['downloader'].strategy_stats.summary())
+            st.caption("Deep crawl: URLs resolved per tier (plain HTTP vs. browser) this session.")
+            st.json(dict(services['deep_crawler'].stats))
+
         if st.button("🚀 Start Search & Download", type="primary"):
             if not query:
                 st.error("Please enter a query")
             else:
                 papers = []
+                dropped = []
+                results = None
+                # Download progress (concurrent; UI updates happen in the callback on this thread)
+                progress_bar = st.progress(0)
+                status_text = st.empty()
+                strategies = build_download_strategies(services)
+
+                def on_progress(done, total, paper, res):
+                    # Streamed searches have no length up front: measure against the limit
+                    total = total or limit
+                    title = paper.get('Title', 'Unknown')
+                    status_text.text(f"Downloaded {done}/{total}: {title[:50]}...")
+                    if res['success']:
+                        st.toast(f"✅ Downloaded ({res.get('source', '')}): {title[:30]}...", icon="✅")
+                    else:
+                        st.warning(f"❌ Failed: {title[:30]}... ({res.get('message', '')})")
+                    progress_bar.progress(min(done / total, 1.0))
+
+                def stream(source_iter):
+                    for p in source_iter:
+                        papers.append(p)
+                        yield p
+
                 with st.spinner(f"Searching {source}..."):
+                    # Generators: nothing is fetched until they are consumed below
                     if "ArXiv" in source:
-                        papers = services['arxiv'].search_papers(query, limit=limit)
+                        found = services['arxiv'].iter_papers(query, limit=limit, force_refresh=force_refresh)
                     elif "PubMed" in source:
-                        papers = services['pubmed'].search_papers(query, limit=limit)
-                    elif "Google Scholar" in source:
+                        found = services['pubmed'].iter_papers(query, limit=limit, force_refresh=force_refresh)
+                    else:
                         st.info("ℹ️ A browser window will open. Please solve any CAPTCHAs manually if they appear.")
-                        papers = services['scholar'].search_papers(query, limit=limit)
+                        found = services['scholar'].iter_papers(query, limit=limit, force_refresh=force_refresh)
+
+                    if screen_on or not interactive_mode:
+                        # Screening ranks the whole hit set and the unattended crawl pre-pass batches
+                        # every landing page, so the search completes before downloads
+                        papers = list(found)
+                    else:
+                        # Downloads start on the first page/batch while later ones are still fetched
+                        results = services['downloader'].download_many(
+                            stream(found),
+                            download_fn=lambda p: services['downloader'].download_paper(p, strategies),
+                            progress_callback=on_progress
+                        )
+                    if "Google Scholar" in source and services['challenge_queue'].pending(KIND_SCHOLAR):
+                        st.warning("⏸️ A Google Scholar CAPTCHA was not solved in time; the rest of the search is parked under 'Needs human'.")
+
+                if screen_on and papers:
+                    with st.spinner(f"Screening {len(papers)} results ({screen_method})..."):
+                        papers, dropped = services['screening'].screen(
+                            papers, screen_criteria or query, method=screen_method, threshold=screen_threshold,
+                            drop=screen_drop, model=screen_model, provider=screen_provider
+                        )
+                    if dropped:
+                        with st.expander(f"🎯 Skipped {len(dropped)} low-relevance papers"):
+                            st.json([{"Title": str(p.get("Title", "")), "Relevance": str(p.get("Relevance"))} for p in dropped])
                 
                 if not papers:
-                    st.error("No papers found.")
+                    st.error("No papers passed screening." if dropped else "No papers found.")
                 else:
                     st.success(f"Found {len(papers)} papers!")
                     
@@ -167,6 +367,7 @@ def main():
                                 "PDF_Link": p.get("PDF_Link", ""),
                                 "URL": p.get("URL", ""),
                                 "Source": p.get("Source", ""),
+                                "Relevance": p.get("Relevance", ""),
                             }
                             preview_rows.append({k: ("" if v is None else str(v)) for k, v in row.items()})
                         else:
@@ -174,72 +375,73 @@ def main():
                     
                     st.json(preview_rows)
                     
-                    # Download process
-                    progress_bar = st.progress(0)
-                    status_text = st.empty()
-                    downloaded_count = 0
-                    
-                    for i, paper in enumerate(papers):
-                        title = paper.get('Title', 'Unknown')
-                        status_text.text(f"Downloading {i+1}/{len(papers)}: {title[:50]}...")
-                        
-                        # SPECIAL CASE: ArXiv (Use library as requested)
-                        if "ArXiv" in paper.get('Source', ''):
-                             status_text.text(f"Using ArXiv Library for: {title[:30]}...")
-                             # Construct generic filename path first to pass to downloader
-                             import re
-                             safe_title = re.sub(r'[^\w\s-]', '', title).strip() + ".pdf"
-                             output_path = os.path.join(Config.DOWNLOAD_DIR, safe_title)
-                             
-                             res = services['arxiv'].download_paper(paper.get('URL', ''), output_path)
-                             if res['success']:
-                                 downloaded_count += 1
-                                 st.toast(f"✅ Downloaded (ArXiv Lib): {title[:30]}...", icon="✅")
-                                 continue
-
-                        # 1. Try Direct PDF Link from Scholar
-                        if paper.get('PDF_Link'):
-                             status_text.text(f"Trying Direct Link for: {title[:30]}...")
-                             # Check if it's potentially an HTML page masquerading as PDF link
-                             res = services['downloader'].download_from_url(paper['PDF_Link'], title)
-                             if res['success']:
-                                 downloaded_count += 1
-                                 st.toast(f"✅ Downloaded: {title[:30]}...", icon="✅")
-                                 continue # Skip to next paper if successful
-
-                        # 1.5 Try Deep Page Crawl
-                        if paper.get('URL') and paper['URL'].startswith('http'):
-                             status_text.text(f"🕵️ Deep Crawling: {title[:30]}...")
-                             found_pdf = services['deep_crawler'].find_pdf_link(paper['URL'], interactive=interactive_mode, sound_alert=sound_alert)
-                             if found_pdf:
-                                 status_text.text(f"   found: {found_pdf[:30]}...")
-                                 res = services['downloader'].download_from_url(found_pdf, title)
-                                 if res['success']:
-                                     downloaded_count += 1
-                                     st.toast(f"✅ Downloaded via Deep Crawl: {title[:30]}...", icon="✅")
-                                     continue
-
-                        # 2. Try Download by DOI (PyPaperRetriever)
-                        doi = paper.get('DOI', 'N/A')
-                        if doi != 'N/A':
-                             status_text.text(f"Trying DOI Download ({doi}) for: {title[:30]}...")
-                             res = services['downloader'].download_by_doi(doi, title)
-                             if res['success']:
-                                 downloaded_count += 1
-                                 st.toast(f"✅ Downloaded via DOI: {title[:30]}...", icon="✅")
-                                 continue
-                             else:
-                                 st.warning(f"❌ Failed via DOI: {title[:30]}...")
-                        else:
-                             st.warning(f"⚠️ No DOI found for: {title[:30]}...")
+                    if results is None:
+                        # Unattended: resolve landing pages up front in a headless parallel batch
+                        if not interactive_mode:
+                            to_crawl = [p for p in papers if not p.get('PDF_Link') and str(p.get('URL') or '').startswith('http')]
+                            if to_crawl:
+                                status_text.text(f"🕵️ Deep crawling {len(to_crawl)} landing pages (headless)...")
+                                links, challenged, captured = services['deep_crawler'].find_pdf_links(
+                                    [p['URL'] for p in to_crawl],
+                                    progress_callback=lambda done, total, url, link: progress_bar.progress(done / total),
+                                    capture_dir=Config.DOWNLOAD_DIR
+                                )
+                                by_url = {p['URL']: p for p in to_crawl}
+                                for url in challenged:
+                                    services['challenge_queue'].add(url, paper=by_url.get(url))
+                                for p in to_crawl:
+                                    p['Crawled'] = True
+                                    if links.get(p['URL']):
+                                        p['PDF_Link'] = links[p['URL']]
+                                    if captured.get(p['URL']):
+                                        # Already downloaded in the browser: the store answers the download below
+                                        services['downloader'].ingest_file(captured[p['URL']], p, "Deep Crawl",
+                                                                           urls=[p['URL'], p['PDF_Link']])
+                                if challenged:
+                                    st.warning(f"🛡️ {len(challenged)} landing pages hit a CAPTCHA/challenge and were queued for you (see 'Needs human').")
 
-                        # REMOVED: Step 3 Fallback (PyPaperBot) as requested by user
-                        
-                        progress_bar.progress((i + 1) / len(papers))
+                        results = services['downloader'].download_many(
+                            papers,
+                            download_fn=lambda p: services['downloader'].download_paper(p, strategies),
+                            progress_callback=on_progress
+                        )
+                    downloaded_count = sum(1 for r in results if r['success'])
+                    for p, r in zip(papers, results):
+                        # Links found by the crawl pre-pass that failed to download are not kept
+                        if not r['success'] and p.get('Crawled') and p.get('PDF_Link'):
+                            services['deep_crawler'].cache.invalidate(url=p['URL'], pdf_url=p['PDF_Link'])
+                        # A challenged landing page needs no human once a later strategy got the paper
+                        if r['success'] and p.get('URL'):
+                            services['challenge_queue'].remove(p['URL'])
                     
                     status_text.text("Download complete!")
                     st.success(f"Downloaded {downloaded_count}/{len(papers)} papers to '{Config.DOWNLOAD_DIR}'")
 
+        # Challenged pages parked by any run; solved one at a time at the operator's pace
+        pending = services['challenge_queue'].pending()
+        if pending:
+            with st.expander(f"🧑 Needs human ({len(pending)})", expanded=True):
+                st.caption("These pages hit a CAPTCHA or Cloudflare check. 'Solve' opens them in a visible browser; once solved, the paper is downloaded.")
+                for i, item in enumerate(pending):
+                    if item['kind'] == KIND_SCHOLAR:
+                        ctx = item.get('context', {})
+                        label = f"Google Scholar search '{ctx.get('query', '')}' (from result {ctx.get('start', 0)})"
+                    else:
+                        label = (item.get('paper') or {}).get('Title') or item['url']
+                    col_label, col_solve, col_drop = st.columns([6, 1, 1])
+                    col_label.markdown(f"**{label}**  \n{item['url']} · tries: {item.get('attempts', 1)}")
+                    if col_solve.button("Solve", key=f"solve_{i}"):
+                        with st.spinner("Waiting for the challenge to be solved in the browser..."):
+                            solved = resolve_challenge(services, item, sound_alert=sound_alert)
+                        ok = sum(1 for r in solved if r.get('success'))
+                        if solved:
+                            st.success(f"Downloaded {ok}/{len(solved)} papers.")
+                        else:
+                            st.warning("Still blocked; the item stays in the queue.")
+                    if col_drop.button("Drop", key=f"drop_{i}"):
+                        services['challenge_queue'].remove(item['url'], kind=item['kind'])
+                        st.rerun()
+
     # --- TAB 2: Local Excel ---
     with tab2:
         st.header("Load from Excel")
@@ -256,36 +458,41 @@ def main():
                 if 'title' in df.columns:
                     if st.button("⬇️ Download Papers from List"):
                         rows = df.to_dict('records')
+                        # Normalize keys
+                        papers = []
+                        for row in rows:
+                            row = {k.lower(): v for k, v in row.items()}
+                            papers.append({
+                                "Title": str(row.get('title', 'Unknown')),
+                                "DOI": str(row.get('doi', 'N/A')).strip()
+                            })
                         
+                        # Rows without a DOI: resolve title -> DOI through CrossRef (cached, concurrent)
+                        if any(not MetadataResolver.has_doi(p) for p in papers):
+                            with st.spinner("Resolving missing DOIs from titles..."):
+                                filled = services['metadata'].fill_dois(papers)
+                            st.info(f"🔎 Found DOIs for {filled} titles via CrossRef")
+
                         progress_bar = st.progress(0)
                         status_text = st.empty()
-                        downloaded_count = 0
-                        
-                        for i, row in enumerate(rows):
-                            # Normalize keys
-                            row = {k.lower(): v for k, v in row.items()}
-                            title = str(row.get('title', 'Unknown'))
-                            doi = str(row.get('doi', 'N/A')).strip()
-                            
-                            status_text.text(f"Processing {i+1}/{len(rows)}: {title[:50]}...")
-                            
-                            success = False
-                            
-                            # Try DOI first if valid
-                            if doi and doi.lower() != 'nan' and doi.lower() != 'n/a':
-                                res = services['downloader'].download_by_doi(doi, title)
-                                if res['success']:
-                                    success = True
-                                    st.toast(f"✅ From Excel (DOI): {title[:30]}...", icon="✅")
-                            
-                            # If we had a URL column we could try that too, but let's stick to DOI for now as requested
-                            if not success and doi == 'N/A':
-                                st.warning(f"⚠️ No DOI for '{title[:15]}...'. Title download disabled.")
-
-                            if success:
-                                downloaded_count += 1
-                                
-                            progress_bar.progress((i + 1) / len(rows))
+                        # If we had a URL column we could try that too, but let's stick to DOI for now as requested
+                        doi_only = [("doi", dict(services['downloader'].default_strategies())["doi"])]
+
+                        def on_progress(done, total, paper, res):
+                            title = paper['Title']
+                            status_text.text(f"Processed {done}/{total}: {title[:50]}...")
+                            if res['success']:
+                                st.toast(f"✅ From Excel (DOI): {title[:30]}...", icon="✅")
+                            elif res.get('source') == "None":
+                                st.warning(f"⚠️ No DOI found for '{title[:15]}...'.")
+                            progress_bar.progress(done / total)
+
+                        results = services['downloader'].download_many(
+                            papers,
+                            download_fn=lambda p: services['downloader'].download_paper(p, doi_only),
+                            progress_callback=on_progress
+                        )
+                        downloaded_count = sum(1 for r in results if r['success'])
                             
                         st.success(f"Downloaded {downloaded_count}/{len(rows)} papers")
                 else:
@@ -302,10 +509,11 @@ def main():
             files = []
             for root, _, filenames in os.walk(Config.DOWNLOAD_DIR):
                 for f in filenames:
-                    if f.endswith('.pdf'):
+                    # PMC full text may be stored as JATS XML instead of a PDF
+                    if f.endswith('.pdf') or (f.endswith('.xml') and not f.startswith('.')):
                         files.append(os.path.join(root, f))
             
-            st.info(f"Found {len(files)} PDFs in '{Config.DOWNLOAD_DIR}'")
+            st.info(f"Found {len(files)} papers (PDF / PMC XML) in '{Config.DOWNLOAD_DIR}'")
             
             # --- Field Configuration ---
             st.subheader("📝 define Extraction Fields")
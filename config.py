@@ -7,10 +7,110 @@ load_dotenv()
 class Config:
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+    # Unpaywall requires a contact email on every request; lookups are skipped until it is set
+    UNPAYWALL_EMAIL = os.getenv("UNPAYWALL_EMAIL", "")
 
     # Defaults
     DOWNLOAD_DIR = "downloaded_papers"
     OUTPUT_FILE = "results/analysis_results.xlsx"
+    CACHE_DIR = os.getenv("SOTA_CACHE_DIR", ".sota_cache")
+
+    # Batch downloads
+    DOWNLOAD_WORKERS = int(os.getenv("DOWNLOAD_WORKERS", "8"))
+    DOWNLOAD_PER_HOST = int(os.getenv("DOWNLOAD_PER_HOST", "2"))
+
+    # Single transfers: resume budget, size cap (0 = no cap) and stall detection
+    DOWNLOAD_CONNECT_TIMEOUT = float(os.getenv("DOWNLOAD_CONNECT_TIMEOUT", "10"))
+    DOWNLOAD_READ_TIMEOUT = float(os.getenv("DOWNLOAD_READ_TIMEOUT", "30"))
+    DOWNLOAD_RESUME_ATTEMPTS = int(os.getenv("DOWNLOAD_RESUME_ATTEMPTS", "3"))
+    DOWNLOAD_MAX_BYTES = int(os.getenv("DOWNLOAD_MAX_BYTES", str(200 * 1024 * 1024)))
+    DOWNLOAD_MIN_BYTES_PER_SEC = int(os.getenv("DOWNLOAD_MIN_BYTES_PER_SEC", "2048"))
+    DOWNLOAD_STALL_WINDOW = float(os.getenv("DOWNLOAD_STALL_WINDOW", "20"))
+
+    # Failed strategies are skipped until their TTL (seconds) expires
+    NEGATIVE_CACHE_TTL = float(os.getenv("NEGATIVE_CACHE_TTL", str(7 * 24 * 3600)))
+    NEGATIVE_CACHE_TRANSIENT_TTL = float(os.getenv("NEGATIVE_CACHE_TRANSIENT_TTL", str(6 * 3600)))
+
+    # Unpaywall OA locations: hits and misses are cached separately (seconds)
+    UNPAYWALL_CACHE_TTL = float(os.getenv("UNPAYWALL_CACHE_TTL", str(30 * 24 * 3600)))
+    UNPAYWALL_MISS_TTL = float(os.getenv("UNPAYWALL_MISS_TTL", str(7 * 24 * 3600)))
+
+    # arXiv streaming search: results per API page, resume attempts after a failed page
+    ARXIV_PAGE_SIZE = int(os.getenv("ARXIV_PAGE_SIZE", "100"))
+    ARXIV_RESUME_ATTEMPTS = int(os.getenv("ARXIV_RESUME_ATTEMPTS", "3"))
+    # arXiv PDF downloads: requests/second and burst, shared by every download thread
+    ARXIV_PDF_RATE = float(os.getenv("ARXIV_PDF_RATE", "1"))
+    ARXIV_PDF_BURST = int(os.getenv("ARXIV_PDF_BURST", "4"))
+    # Local arXiv metadata mirror (services/arxiv_mirror.py), filled with main.py --sync-arxiv.
+    # off = always use the API, prefer = local first with API fallback, only = never call the API
+    ARXIV_MIRROR = os.getenv("ARXIV_MIRROR", "prefer").lower()
+    ARXIV_MIRROR_PATH = os.getenv("ARXIV_MIRROR_PATH", os.path.join(CACHE_DIR, "arxiv_mirror.sqlite"))
+    ARXIV_OAI_ENDPOINT = os.getenv("ARXIV_OAI_ENDPOINT", "https://oaipmh.arxiv.org/oai")
+
+    # NCBI E-utilities (PubMed): contact email, optional API key (raises 3 -> 10 requests/second),
+    # summaries per esummary call and concurrent calls
+    NCBI_EMAIL = os.getenv("NCBI_EMAIL", UNPAYWALL_EMAIL)
+    NCBI_API_KEY = os.getenv("NCBI_API_KEY", "")
+    NCBI_RATE = float(os.getenv("NCBI_RATE", "10" if NCBI_API_KEY else "3"))
+    PUBMED_BATCH_SIZE = int(os.getenv("PUBMED_BATCH_SIZE", "200"))
+    PUBMED_WORKERS = int(os.getenv("PUBMED_WORKERS", "3"))
+    # One extra efetch per batch so results carry their abstract (used by screening)
+    PUBMED_FETCH_ABSTRACTS = os.getenv("PUBMED_FETCH_ABSTRACTS", "true").lower() in ("1", "true", "yes")
+    # PMC open-access lookups (PMCID -> PDF / package): OA answers and "not OA" misses (seconds)
+    PMC_OA_CACHE_TTL = float(os.getenv("PMC_OA_CACHE_TTL", str(30 * 24 * 3600)))
+    PMC_OA_MISS_TTL = float(os.getenv("PMC_OA_MISS_TTL", str(7 * 24 * 3600)))
+
+    # Search results per (source, query, limit), in seconds; 0 disables the cache
+    SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", str(24 * 3600)))
+
+    # Pre-download relevance screening (services/screening_service.py): keywords | tfidf | llm,
+    # minimum relevance (0..1), papers per LLM call and abstract characters sent per paper
+    SCREENING_METHOD = os.getenv("SCREENING_METHOD", "keywords").lower()
+    SCREENING_THRESHOLD = float(os.getenv("SCREENING_THRESHOLD", "0.3"))
+    SCREENING_LLM_BATCH = int(os.getenv("SCREENING_LLM_BATCH", "40"))
+    SCREENING_ABSTRACT_CHARS = int(os.getenv("SCREENING_ABSTRACT_CHARS", "800"))
+
+    # Title -> DOI resolution through CrossRef (requests/second, workers, min title similarity)
+    METADATA_RATE = float(os.getenv("METADATA_RATE", "5"))
+    METADATA_WORKERS = int(os.getenv("METADATA_WORKERS", "3"))
+    METADATA_MIN_SCORE = float(os.getenv("METADATA_MIN_SCORE", "0.9"))
+    METADATA_CACHE_TTL = float(os.getenv("METADATA_CACHE_TTL", str(90 * 24 * 3600)))
+    METADATA_MISS_TTL = float(os.getenv("METADATA_MISS_TTL", str(7 * 24 * 3600)))
+
+    # Deep crawler browser pool (services/browser_pool.py)
+    BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+    BROWSER_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "50"))
+    # Browser page readiness: poll the DOM instead of sleeping a fixed time
+    CRAWL_READY_TIMEOUT = float(os.getenv("CRAWL_READY_TIMEOUT", "8"))
+    CRAWL_SETTLE_SECONDS = float(os.getenv("CRAWL_SETTLE_SECONDS", "1"))
+    CRAWL_POLL_INTERVAL = float(os.getenv("CRAWL_POLL_INTERVAL", "0.1"))
+    SCHOLAR_CAPTCHA_TIMEOUT = float(os.getenv("SCHOLAR_CAPTCHA_TIMEOUT", "120"))
+    # Publisher PDF link rules for the deep crawler (empty = services/domain_rules.json)
+    DOMAIN_RULES_FILE = os.getenv("DOMAIN_RULES_FILE", "")
+    # Max seconds to download a PDF inside the crawler's browser session
+    CRAWL_CAPTURE_TIMEOUT = float(os.getenv("CRAWL_CAPTURE_TIMEOUT", "60"))
+    # Most bytes of a landing page the HTTP fast path reads before parsing it
+    CRAWL_MAX_HTML_BYTES = int(os.getenv("CRAWL_MAX_HTML_BYTES", str(5 * 1024 * 1024)))
+    # Landing page -> PDF link cache (seconds)
+    CRAWL_CACHE_TTL = float(os.getenv("CRAWL_CACHE_TTL", str(30 * 24 * 3600)))
+    # Headless batch crawl (DeepPDFCrawler.find_pdf_links)
+    CRAWL_BATCH_WORKERS = int(os.getenv("CRAWL_BATCH_WORKERS", "4"))
+    CRAWL_PER_DOMAIN = int(os.getenv("CRAWL_PER_DOMAIN", "1"))
+    CRAWL_DOMAIN_DELAY = float(os.getenv("CRAWL_DOMAIN_DELAY", "2"))
+
+    # Adaptive strategy ordering (services/strategy_stats.py)
+    STRATEGY_MIN_SAMPLES = int(os.getenv("STRATEGY_MIN_SAMPLES", "3"))
+    STRATEGY_SKIP_AFTER = int(os.getenv("STRATEGY_SKIP_AFTER", "8"))
+    STRATEGY_EXPLORE_RATE = float(os.getenv("STRATEGY_EXPLORE_RATE", "0.05"))
+
+    # Shared HTTP client (services/http_client.py)
+    USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+    HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+    HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", "1.0"))
+    HTTP_MAX_BACKOFF = float(os.getenv("HTTP_MAX_BACKOFF", "60"))
+    HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "32"))
+    HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))
+    HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() in ("1", "true", "yes")
 
     @staticmethod
     def validate_keys(provider="openai"):
@@ -11,14 +11,17 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from config import Config
 from services.arxiv_service import ArxivService
 from services.downloader_service import DownloaderService
+from services.metadata_resolver import MetadataResolver
 from services.pdf_processor import PDFProcessor
+from services.screening_service import ScreeningService, METHODS as SCREENING_METHODS
 from services.analyzer_service import AnalyzerService
 from utils.excel_handler import ExcelHandler
 
-def process_paper(title, downloader, pdf_processor, analyzer, prompt_key="default_analysis",
+def process_paper(title, download_res, pdf_processor, analyzer, prompt_key="default_analysis",
                   model="gpt-4o-mini", provider="openai"):
     """
-    Process a single paper: Download -> Extract -> Analyze
+    Process a single paper: (Downloaded) -> Extract -> Analyze
+    Downloads happen up front in a concurrent batch, see DownloaderService.download_many.
     """
     result = {
         "Title": title,
@@ -28,8 +31,7 @@ def process_paper(title, downloader, pdf_processor, analyzer, prompt_key="defaul
     }
 
     # 1. Download
-    print(f"\n[1/3] Downloading '{title[:50]}...'")
-    download_res = downloader.download_paper(title)
+    print(f"\n[1/3] Downloaded '{title[:50]}...'")
 
     if not download_res['success']:
         print(f"❌ Download failed: {download_res['message']}")
@@ -41,10 +43,10 @@ def process_paper(title, downloader, pdf_processor, analyzer, prompt_key="defaul
 
     # 2. Extract Text
     print(f"[2/3] Extracting text from {os.path.basename(pdf_path)}...")
-    text = pdf_processor.extract_text(pdf_path, max_pages=20) # Limit pages for speed/cost
+    text, error = pdf_processor.extract_text(pdf_path, max_pages=20) # Limit pages for speed/cost
 
     if not text:
-        print("❌ Text extraction failed (empty or protected PDF)")
+        print(f"❌ Text extraction failed: {error or 'empty or protected PDF'}")
         result["Status"] = "Extraction Failed"
         return result
 
@@ -74,8 +76,25 @@ def main():
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument("--query", help="Search query for ArXiv")
     group.add_argument("--excel", help="Path to input Excel file with titles")
+    group.add_argument("--sync-arxiv", nargs="?", const="", metavar="SOURCE",
+                       help="Update the local arXiv mirror from an OAI-PMH harvest file, directory "
+                            "or endpoint URL (default: ARXIV_OAI_ENDPOINT), then exit")
+
+    parser.add_argument("--sync-set", default=None,
+                        help="OAI-PMH set to harvest with --sync-arxiv, e.g. cs or physics:hep-th")
 
     parser.add_argument("--limit", type=int, default=5, help="Max number of papers to process")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Ignore cached search results and query the source again")
+    parser.add_argument("--screen", nargs="?", const="", metavar="CRITERIA",
+                        help="Score titles/abstracts before downloading and skip low-relevance papers "
+                             "(criteria default to --query)")
+    parser.add_argument("--screen-method", choices=SCREENING_METHODS, default=None,
+                        help=f"Screening scorer (default: {Config.SCREENING_METHOD}; llm uses --provider/--model)")
+    parser.add_argument("--screen-threshold", type=float, default=None,
+                        help=f"Minimum relevance 0..1 (default: {Config.SCREENING_THRESHOLD})")
+    parser.add_argument("--keep-low", action="store_true",
+                        help="With --screen, download low-relevance papers last instead of skipping them")
     parser.add_argument("--output", default=Config.OUTPUT_FILE, help="Output Excel file")
     parser.add_argument("--prompt", default="default_analysis", help="Prompt key from prompts.yaml")
     parser.add_argument("--provider", choices=["openai", "ollama"], default="openai",
@@ -95,6 +114,12 @@ def main():
     if args.ollama_url:
         Config.OLLAMA_BASE_URL = args.ollama_url
     
+    # Mode 0: refresh the local arXiv mirror only
+    if args.sync_arxiv is not None:
+        count = ArxivService().sync_mirror(args.sync_arxiv or None, set_spec=args.sync_set)
+        print(f"\n📚 arXiv mirror updated: {count} records applied")
+        return
+
     # Initialize services
     print("Initializing services...")
     search_service = ArxivService()
@@ -107,33 +132,79 @@ def main():
     # Mode 1: Search
     if args.query:
         print(f"Searching ArXiv for: {args.query}")
-        papers = search_service.search_papers(args.query, limit=args.limit)
-        # Extract titles
-        for p in papers:
-            papers_to_process.append(p.get("Title"))
+        # Streamed: downloads below start on the first page of results
+        papers_to_process = search_service.iter_papers(args.query, limit=args.limit, force_refresh=args.refresh)
+        searched = []
             
     # Mode 2: Excel
     elif args.excel:
         print(f"Reading from Excel: {args.excel}")
         try:
-            papers_to_process = ExcelHandler.read_titles(args.excel)
+            papers_to_process = [{"Title": t} for t in ExcelHandler.read_titles(args.excel)]
             if args.limit:
                 papers_to_process = papers_to_process[:args.limit]
+            # Titles only: look up DOIs so the DOI download strategies apply
+            MetadataResolver().fill_dois(papers_to_process)
         except Exception as e:
             print(f"Error reading Excel: {e}")
             return
 
-    if not papers_to_process:
+    # Optional screening: the whole result set is scored before any download starts
+    if args.screen is not None:
+        criteria = args.screen or args.query
+        if not criteria:
+            print("--screen needs criteria when no --query is given, e.g. --screen \"protein folding\"")
+            return
+        papers_to_process, dropped = ScreeningService().screen(
+            list(papers_to_process), criteria, method=args.screen_method, threshold=args.screen_threshold,
+            drop=not args.keep_low, model=args.model, provider=args.provider
+        )
+        for paper in dropped:
+            print(f"   ⏭️ Skipped (relevance {paper.get('Relevance')}): {str(paper.get('Title'))[:70]}")
+
+    streamed = not isinstance(papers_to_process, list)
+    if streamed:
+        stream = papers_to_process
+
+        def _collect():
+            for paper in stream:
+                searched.append(paper)
+                yield paper
+        papers_to_process = _collect()
+    elif not papers_to_process:
         print("No papers found to process.")
         return
-        
-    print(f"Found {len(papers_to_process)} papers. Starting processing...")
+    else:
+        print(f"Found {len(papers_to_process)} papers. Starting processing...")
     print(f"Using {args.provider} with model: {args.model}")
 
+    # arXiv hits go through ArxivService (shared ARXIV_PDF_RATE limit) before the generic strategies
+    def try_arxiv(paper):
+        if "ArXiv" not in paper.get('Source', ''):
+            return None
+        return search_service.download_to_store(paper, downloader)
+    strategies = [("arxiv", try_arxiv)] + downloader.default_strategies()
+
+    # Download everything concurrently first; the network is the bottleneck
+    with tqdm(total=args.limit if streamed else len(papers_to_process), desc="Downloading") as bar:
+        download_results = downloader.download_many(
+            papers_to_process,
+            download_fn=lambda paper: downloader.download_paper(paper, strategies),
+            progress_callback=lambda done, total, paper, res: bar.update(1)
+        )
+
+    if streamed:
+        papers_to_process = searched
+        if not papers_to_process:
+            print("No papers found to process.")
+            return
+        print(f"Found {len(papers_to_process)} papers.")
+
     results = []
-    for title in tqdm(papers_to_process):
+    for paper, download_res in tqdm(list(zip(papers_to_process, download_results)), desc="Analyzing"):
+        title = paper.get("Title")
         try:
-            res = process_paper(title, downloader, pdf_processor, analyzer, args.prompt,
+            res = process_paper(title, download_res, pdf_processor, analyzer, args.prompt,
                                model=args.model, provider=args.provider)
             results.append(res)
         except Exception as e:
@@ -108,6 +108,16 @@ If information is missing, set the value to "N/A".{json_instruction}"""
         else:
             return self._analyze_with_openai(system_msg, user_msg, model)
 
+    def complete_json(self, system_msg: str, user_msg: str, model: str = "gpt-4o-mini",
+                      provider: str = "openai") -> dict:
+        """
+        Send a ready-made prompt (e.g. the batched screening prompt) and return the parsed JSON.
+        """
+        if provider == "ollama":
+            user_msg += "\n\nIMPORTANT: You MUST respond with ONLY valid JSON. No explanations, no markdown, just the JSON object."
+            return self._analyze_with_ollama(system_msg, user_msg, model)
+        return self._analyze_with_openai(system_msg, user_msg, model)
+
     def _analyze_with_openai(self, system_msg: str, user_msg: str, model: str) -> dict:
         """Call OpenAI API."""
         try:
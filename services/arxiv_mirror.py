@@ -0,0 +1,275 @@
+import os
+import re
+import sqlite3
+import threading
+import xml.etree.ElementTree as ET
+
+from config import Config
+from services.http_client import get_http_client
+
+OAI_NS = "{http://www.openarchives.org/OAI/2.0/}"
+ARXIV_NS = "{http://arxiv.org/OAI/arXiv/}"
+
+# arXiv API field prefixes -> mirror FTS columns
+FIELD_COLUMNS = {"ti": "title", "abs": "abstract", "au": "authors", "cat": "categories", "all": None}
+OPERATORS = {"AND": "AND", "OR": "OR", "ANDNOT": "NOT", "NOT": "NOT"}
+_TOKEN_RE = re.compile(r'\(|\)|(?:(\w+):)?("[^"]*"|[^\s()]+)')
+
+
+class ArxivMirror:
+    """
+    Optional local arXiv metadata store (SQLite + FTS5) for offline search.
+
+    It is filled from OAI-PMH ListRecords responses in the 'arXiv' metadata format,
+    either harvest files on disk or an endpoint (ARXIV_OAI_ENDPOINT by default).
+    Syncs are incremental: endpoint harvests continue from the last datestamp seen.
+    search() understands the arXiv API query syntax (ti:, abs:, au:, cat:, all:,
+    AND / OR / ANDNOT, quotes, parentheses) and returns the same dicts as ArxivService.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or Config.ARXIV_MIRROR_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS papers (
+                    rowid INTEGER PRIMARY KEY,
+                    id TEXT UNIQUE NOT NULL,
+                    title TEXT, abstract TEXT, authors TEXT, categories TEXT,
+                    doi TEXT, created TEXT, updated TEXT, datestamp TEXT
+                );
+                CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+                    title, abstract, authors, categories,
+                    content='papers', content_rowid='rowid'
+                );
+                CREATE TRIGGER IF NOT EXISTS papers_ai AFTER INSERT ON papers BEGIN
+                    INSERT INTO papers_fts(rowid, title, abstract, authors, categories)
+                    VALUES (new.rowid, new.title, new.abstract, new.authors, new.categories);
+                END;
+                CREATE TRIGGER IF NOT EXISTS papers_ad AFTER DELETE ON papers BEGIN
+                    INSERT INTO papers_fts(papers_fts, rowid, title, abstract, authors, categories)
+                    VALUES ('delete', old.rowid, old.title, old.abstract, old.authors, old.categories);
+                END;
+                CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT);
+            """)
+
+    def _state(self, key: str):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key: str, value: str):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, value))
+
+    # --- Harvesting ---
+
+    @staticmethod
+    def _text(elem, tag: str) -> str:
+        child = elem.find(ARXIV_NS + tag)
+        return re.sub(r'\s+', ' ', child.text).strip() if child is not None and child.text else ""
+
+    def _parse_record(self, record):
+        """
+        OAI <record> -> ("upsert", row, datestamp) / ("delete", id, datestamp) / None.
+        """
+        header = record.find(OAI_NS + "header")
+        if header is None:
+            return None
+        datestamp = header.findtext(OAI_NS + "datestamp") or ""
+        identifier = header.findtext(OAI_NS + "identifier") or ""
+        if header.get("status") == "deleted":
+            return "delete", identifier.rsplit(":", 1)[-1], datestamp
+        meta = record.find(f"{OAI_NS}metadata/{ARXIV_NS}arXiv")
+        if meta is None:
+            return None
+        authors = []
+        for author in meta.iter(ARXIV_NS + "author"):
+            name = " ".join(p for p in (self._text(author, "forenames"), self._text(author, "keyname")) if p)
+            if name:
+                authors.append(name)
+        row = {
+            "id": self._text(meta, "id"),
+            "title": self._text(meta, "title"),
+            "abstract": self._text(meta, "abstract"),
+            "authors": ", ".join(authors),
+            "categories": self._text(meta, "categories"),
+            "doi": self._text(meta, "doi"),
+            "created": self._text(meta, "created"),
+            "updated": self._text(meta, "updated"),
+            "datestamp": datestamp
+        }
+        return ("upsert", row, datestamp) if row["id"] else None
+
+    def _ingest(self, stream) -> tuple:
+        """
+        Stream-parse one ListRecords document. Returns (records applied, resumption token).
+        """
+        applied = 0
+        token = None
+        latest = self._state("last_datestamp") or ""
+        batch = []
+        for _, elem in ET.iterparse(stream, events=("end",)):
+            if elem.tag == OAI_NS + "record":
+                parsed = self._parse_record(elem)
+                elem.clear()
+                if parsed:
+                    batch.append(parsed)
+                    latest = max(latest, parsed[2])
+                if len(batch) >= 500:
+                    applied += self._apply(batch)
+                    batch = []
+            elif elem.tag == OAI_NS + "resumptionToken":
+                token = (elem.text or "").strip() or None
+        applied += self._apply(batch)
+        if latest:
+            self._set_state("last_datestamp", latest)
+        return applied, token
+
+    def _apply(self, batch: list) -> int:
+        if not batch:
+            return 0
+        with self._lock, self._conn:
+            for action, payload, _ in batch:
+                # Delete first so the FTS index is updated through the triggers
+                key = payload["id"] if action == "upsert" else payload
+                self._conn.execute("DELETE FROM papers WHERE id = ?", (key,))
+                if action == "upsert":
+                    self._conn.execute(
+                        "INSERT INTO papers (id, title, abstract, authors, categories, doi, created, updated, datestamp) "
+                        "VALUES (:id, :title, :abstract, :authors, :categories, :doi, :created, :updated, :datestamp)",
+                        payload)
+        return len(batch)
+
+    def sync(self, source: str, set_spec: str = None, from_date: str = None) -> int:
+        """
+        Incrementally load records from a harvest file, a directory of harvest files,
+        or an OAI-PMH endpoint URL. Returns the number of records applied.
+        """
+        if source.startswith(("http://", "https://")):
+            return self._sync_endpoint(source, set_spec, from_date)
+
+        paths = [source]
+        if os.path.isdir(source):
+            paths = sorted(os.path.join(source, f) for f in os.listdir(source) if f.endswith(".xml"))
+        total = 0
+        for path in paths:
+            with open(path, "rb") as f:
+                applied, _ = self._ingest(f)
+            print(f"📚 Mirror: {applied} records from {os.path.basename(path)}")
+            total += applied
+        return total
+
+    def _sync_endpoint(self, endpoint: str, set_spec: str = None, from_date: str = None) -> int:
+        http = get_http_client()
+        # Datestamps are days: re-harvesting the last day is harmless (records are upserted)
+        from_date = from_date or (self._state("last_datestamp") or "")[:10] or None
+        params = {"verb": "ListRecords", "metadataPrefix": "arXiv"}
+        if set_spec:
+            params["set"] = set_spec
+        if from_date:
+            params["from"] = from_date
+        print(f"📚 Mirror: harvesting {endpoint} (set={set_spec or 'all'}, from={from_date or 'start'})")
+
+        total = 0
+        while True:
+            # 503 + Retry-After is OAI-PMH flow control; the HTTP client honours it
+            response = http.get(endpoint, params=params, stream=True, timeout=120)
+            response.raise_for_status()
+            response.raw.decode_content = True
+            try:
+                applied, token = self._ingest(response.raw)
+            finally:
+                response.close()
+            total += applied
+            print(f"   {total} records so far")
+            if not token:
+                return total
+            params = {"verb": "ListRecords", "resumptionToken": token}
+
+    # --- Search ---
+
+    @staticmethod
+    def _phrase(value: str) -> str:
+        prefix = value.endswith("*") and not value.startswith('"')
+        value = value.strip('"').rstrip("*").replace('"', '""')
+        return f'"{value}"' + ("*" if prefix else "")
+
+    def to_fts_query(self, query: str) -> str:
+        """
+        Translate an arXiv API query ('ti:LLM AND abs:"large language"') to FTS5 MATCH syntax.
+        """
+        parts = []
+        for match in _TOKEN_RE.finditer(query or ""):
+            token = match.group(0)
+            if token in ("(", ")"):
+                parts.append(token)
+                continue
+            field, value = match.group(1), match.group(2)
+            if field is None and value.upper() in OPERATORS:
+                parts.append(OPERATORS[value.upper()])
+                continue
+            column = FIELD_COLUMNS.get((field or "all").lower())
+            term = self._phrase(value)
+            parts.append(f"{column} : {term}" if column else term)
+        # Adjacent terms are an implicit AND in FTS5, as in the arXiv API
+        return " ".join(parts)
+
+    @staticmethod
+    def _to_paper(row) -> dict:
+        year = (row["created"] or row["datestamp"] or "")[:4]
+        return {
+            "Title": row["title"],
+            "DOI": row["doi"] or f"ArXiv:{row['id']}",
+            "ArXiv_ID": row["id"],
+            "Publication_Year": int(year) if year.isdigit() else "N/A",
+            "Authors": row["authors"],
+            "Abstract": row["abstract"],
+            "Source": "ArXiv",
+            "URL": f"https://arxiv.org/pdf/{row['id']}"
+        }
+
+    def search(self, query: str, limit: int = 10, offset: int = 0) -> list:
+        """
+        Best-ranked (bm25) local matches for an arXiv-syntax query.
+        """
+        fts_query = self.to_fts_query(query)
+        if not fts_query:
+            return []
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT p.* FROM papers_fts JOIN papers p ON p.rowid = papers_fts.rowid "
+                    "WHERE papers_fts MATCH ? ORDER BY bm25(papers_fts) LIMIT ? OFFSET ?",
+                    (fts_query, int(limit), int(offset))
+                ).fetchall()
+        except sqlite3.OperationalError as e:
+            # Queries FTS5 cannot express (e.g. a leading ANDNOT) go to the live API
+            print(f"ArXiv Mirror: cannot search {query!r} locally ({e})")
+            return []
+        return [self._to_paper(row) for row in rows]
+
+
+_mirror = None
+_mirror_lock = threading.Lock()
+
+
+def get_arxiv_mirror():
+    """
+    The configured mirror, or None when ARXIV_MIRROR is 'off' or no mirror was synced yet.
+    """
+    global _mirror
+    if Config.ARXIV_MIRROR == "off":
+        return None
+    with _mirror_lock:
+        if _mirror is None:
+            if not os.path.exists(Config.ARXIV_MIRROR_PATH):
+                return None
+            _mirror = ArxivMirror(Config.ARXIV_MIRROR_PATH)
+        return _mirror
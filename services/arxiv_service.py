@@ -1,81 +1,212 @@
 
 import arxiv
-import requests
 import os
+import re
+import tempfile
+import threading
+import time
+
+from config import Config
+from services.arxiv_mirror import ArxivMirror, get_arxiv_mirror
+from services.http_client import get_http_client
+from services.search_cache import SearchCache, get_search_cache
+from utils.concurrency import RateLimiter
+
+# 2101.00001 / 2101.00001v2 (new style) and hep-th/0001001 / math.GT/0309136v1 (old style)
+NEW_ID_RE = re.compile(r'(?<![\w.])(\d{4}\.\d{4,5}(?:v\d+)?)')
+OLD_ID_RE = re.compile(r'(?<![\w-])([a-z][a-z-]*(?:\.[A-Z]{2})?/\d{7}(?:v\d+)?)')
+
+# One budget for every ArxivService instance: arXiv asks for gentle, bursty-at-most access
+_pdf_rate_limiter = RateLimiter(Config.ARXIV_PDF_RATE, burst=Config.ARXIV_PDF_BURST)
 
 class ArxivService:
-    def search_papers(self, query: str, limit: int = 10) -> list:
+    def __init__(self, http_client=None, search_cache: SearchCache = None, mirror: ArxivMirror = None):
+        self.http = http_client or get_http_client()
+        self.search_cache = search_cache or get_search_cache()
+        self.mirror = mirror or get_arxiv_mirror()
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+
+    def _client(self, page_size: int = None) -> arxiv.Client:
+        """
+        Shared arxiv.Client per page size, reusing the pooled keep-alive session.
+        Reusing the client also keeps arXiv's delay between API calls across searches.
+        """
+        page_size = page_size or Config.ARXIV_PAGE_SIZE
+        with self._clients_lock:
+            client = self._clients.get(page_size)
+            if client is None:
+                client = arxiv.Client(page_size=page_size)
+                if hasattr(client, '_session'):
+                    client._session = self.http.session
+                self._clients[page_size] = client
+            return client
+
+    def search_papers(self, query: str, limit: int = 10, force_refresh: bool = False) -> list:
         """
         Search for papers in ArXiv.
-        Returns list of dicts with Title, DOI, Publication_Year, Source, URL.
+        Returns list of dicts with Title, DOI, Publication_Year, Source, URL, Abstract.
+        Results are cached per query/limit; force_refresh queries arXiv again.
         """
+        return list(self.iter_papers(query, limit=limit, force_refresh=force_refresh))
+
+    def iter_papers(self, query: str, limit: int = 10, offset: int = 0, page_size: int = None,
+                    force_refresh: bool = False):
+        """
+        Stream search results as they arrive, one API page (page_size results) at a time,
+        so downloads can start on the first page while later pages are still fetched.
+
+        offset skips that many results: a caller that consumed N results before a crash
+        resumes with offset=N. A failure mid-stream is also resumed here from the last
+        yielded position, up to ARXIV_RESUME_ATTEMPTS times.
+        Complete searches from offset 0 are cached per query/limit (see SearchCache).
+
+        With a synced local mirror (ARXIV_MIRROR=prefer) the query is answered from it
+        without network access when it has at least `limit` matches; fewer matches fall
+        back to the API, as does force_refresh. ARXIV_MIRROR=only never calls the API.
+        """
+        if Config.ARXIV_MIRROR == "only":
+            if self.mirror is None:
+                print("⚠️ ARXIV_MIRROR=only but no local arXiv mirror was synced (main.py --sync-arxiv)")
+                return
+            local = self.mirror.search(query, limit=limit, offset=offset)
+            print(f"📚 Using local arXiv mirror for: {query} ({len(local)} papers)")
+            yield from local
+            return
+
+        if self.mirror is not None and Config.ARXIV_MIRROR != "off" and not force_refresh:
+            local = self.mirror.search(query, limit=limit, offset=offset)
+            # A partial local match may only mean the mirror misses newer or other categories
+            if len(local) >= limit:
+                print(f"📚 Using local arXiv mirror for: {query} ({len(local)} papers)")
+                yield from local
+                return
+
+        if offset == 0 and not force_refresh:
+            cached = self.search_cache.get("arxiv", query, limit)
+            if cached is not None:
+                print(f"⚡ Using cached arxiv results for: {query} ({len(cached)} papers)")
+                yield from cached
+                return
+
         print(f"Searching ArXiv for: {query}")
-        try:
-            # Construct client
-            client = arxiv.Client()
-            
-            # Construct search
+        client = self._client(page_size)
+        position = offset
+        collected = []
+        failures = 0
+        while True:
+            # max_results counts from the start of the result set, not from the offset
             search = arxiv.Search(
                 query=query,
-                max_results=limit,
+                max_results=offset + limit,
                 sort_by=arxiv.SortCriterion.Relevance
             )
-            
-            results = []
-            for r in client.results(search):
-                # Clean title
-                title = r.title.replace('\n', ' ')
-                
-                # Get DOI if available, else use ArXiv URL
-                doi = r.doi if r.doi else f"ArXiv:{r.get_short_id()}"
-                
-                results.append({
-                    "Title": title,
-                    "DOI": doi,
-                    "Publication_Year": r.published.year,
-                    "Authors": ", ".join([a.name for a in r.authors]),
-                    "Source": "ArXiv",
-                    "URL": r.pdf_url
-                })
-                
-            return results
-            
-        except Exception as e:
-            print(f"ArXiv Search Error: {e}")
-            return []
+            try:
+                for r in client.results(search, offset=position):
+                    paper = self._to_paper(r)
+                    position += 1
+                    if offset == 0:
+                        collected.append(dict(paper))
+                    yield paper
+                break
+            except Exception as e:
+                failures += 1
+                if failures > Config.ARXIV_RESUME_ATTEMPTS:
+                    print(f"ArXiv Search Error: {e} (stopped at offset {position})")
+                    return
+                print(f"ArXiv Search Error: {e}; resuming at offset {position}")
+                time.sleep(min(2 ** failures, 30))
+
+        if offset == 0:
+            self.search_cache.set("arxiv", query, limit, collected)
+
+    @staticmethod
+    def _to_paper(r) -> dict:
+        """
+        arxiv.Result -> search result dict.
+        """
+        # Clean title
+        title = r.title.replace('\n', ' ')
+        
+        # Get DOI if available, else use ArXiv URL
+        doi = r.doi if r.doi else f"ArXiv:{r.get_short_id()}"
+        
+        return {
+            "Title": title,
+            "DOI": doi,
+            "ArXiv_ID": r.get_short_id(),
+            "Publication_Year": r.published.year,
+            "Authors": ", ".join([a.name for a in r.authors]),
+            "Abstract": re.sub(r'\s+', ' ', r.summary or '').strip(),
+            "Source": "ArXiv",
+            "URL": r.pdf_url
+        }
+
+    @staticmethod
+    def parse_id(value: str) -> str:
+        """
+        Extract an arXiv ID (version kept) from an abs/pdf URL, 'ArXiv:<id>' or a bare ID.
+        Handles new-style (2101.00001v2) and old-style (hep-th/0001001, math.GT/0309136) IDs.
+        """
+        value = str(value or '').strip()
+        match = NEW_ID_RE.search(value) or OLD_ID_RE.search(value)
+        return match.group(1) if match else ""
+
+    @staticmethod
+    def pdf_url(arxiv_id: str) -> str:
+        return f"https://arxiv.org/pdf/{arxiv_id}"
+
+    def sync_mirror(self, source: str = None, set_spec: str = None, from_date: str = None) -> int:
+        """
+        Incrementally update the local mirror from a harvest file/directory or an
+        OAI-PMH endpoint (ARXIV_OAI_ENDPOINT when source is omitted).
+        """
+        if self.mirror is None:
+            self.mirror = ArxivMirror()
+        return self.mirror.sync(source or Config.ARXIV_OAI_ENDPOINT, set_spec=set_spec, from_date=from_date)
+
+    def download_to_store(self, paper: dict, downloader) -> dict:
+        """
+        Download strategy for arXiv results: the PDF is fetched under the shared arXiv rate
+        limit (ARXIV_PDF_RATE) into a unique hidden .part file, then moved into the
+        downloader's PDFStore. Concurrent hits never share a path.
+        """
+        fd, part_path = tempfile.mkstemp(prefix=".arxiv-", suffix=".part", dir=downloader.download_dir)
+        os.close(fd)
+        res = self.download_paper(paper.get('ArXiv_ID') or paper.get('URL') or paper.get('DOI', ''), part_path)
+        if res['success'] and os.path.isfile(part_path):
+            # Register in the PDF store so DOI/Scholar paths find it next time
+            return downloader.ingest_file(part_path, paper, res['source'])
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        return res
 
     def download_paper(self, arxiv_url: str, output_path: str) -> dict:
         """
-        Download paper using arxiv library.
+        Download one arXiv PDF. The PDF URL is derived from the ID, so no metadata
+        request is made; transfers share a rate limit (ARXIV_PDF_RATE) across threads.
         """
         try:
-            # Extract ID from URL (e.g., http://arxiv.org/abs/2101.00000 -> 2101.00000)
-            # or http://arxiv.org/pdf/2101.00000
-            import re
-            
-            # Match 4 digits followed by dot and digits (arxiv id format)
-            # Optional version number at the end
-            # We look for the last occurrence of this pattern in the URL
-            match = re.search(r'(\d{4}\.\d{4,5}(v\d+)?)', arxiv_url)
-            
-            if not match:
-                # Try finding just the ID part if it's old format (e.g. hep-th/0001001), but keeping it simple for now
-                # as most are standard. If not found, fall back to last part of url
-                paper_id = arxiv_url.split('/')[-1].replace('.pdf', '')
-            else:
-                paper_id = match.group(0)
+            paper_id = self.parse_id(arxiv_url)
+            if not paper_id:
+                raise ValueError(f"No arXiv ID in {arxiv_url!r}")
             
             print(f"Downloading ArXiv paper {paper_id}...")
             
-            client = arxiv.Client()
-            search = arxiv.Search(id_list=[paper_id])
-            paper = next(client.results(search))
-            
-            # Filename
+            # Fetch the PDF through the pooled session (retries + keep-alive)
             directory = os.path.dirname(output_path)
-            filename = os.path.basename(output_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
             
-            paper.download_pdf(dirpath=directory, filename=filename)
+            with _pdf_rate_limiter:
+                response = self.http.get(self.pdf_url(paper_id), stream=True, timeout=60)
+            try:
+                response.raise_for_status()
+                with open(output_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=65536):
+                        f.write(chunk)
+            finally:
+                response.close()
             
             return {
                 "success": True,
@@ -0,0 +1,216 @@
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+
+from config import Config
+from utils.concurrency import HostLimiter
+
+try:
+    import undetected_chromedriver as uc
+    SELENIUM_AVAILABLE = True
+except ImportError:
+    SELENIUM_AVAILABLE = False
+
+
+class BrowserSession:
+    """
+    One live Chrome instance plus the bookkeeping the pool needs.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.domains = set()
+        self.created_at = time.time()
+        self.broken = False
+
+
+class BrowserPool:
+    """
+    Long-lived pool of undetected-chromedriver sessions shared across crawls.
+
+    - A session that already visited a domain is preferred for that domain, so cookies
+      and Cloudflare clearance earned on the previous page are reused.
+    - Cookies are also kept per domain and injected into fresh browsers.
+    - Sessions are health-checked before reuse and recycled after max_pages pages.
+    - Everything is shut down at interpreter exit.
+    """
+
+    # uc patches the chromedriver binary on launch, which is not safe to do concurrently
+    _launch_lock = threading.Lock()
+
+    def __init__(self, size: int = None, headless: bool = False, max_pages: int = None):
+        self.size = size or Config.BROWSER_POOL_SIZE
+        self.headless = headless
+        self.max_pages = max_pages or Config.BROWSER_MAX_PAGES
+        self._cond = threading.Condition()
+        self._idle = []
+        self._busy = set()
+        self._cookies = {}
+        self._closed = False
+        atexit.register(self.shutdown)
+
+    def _options(self):
+        options = uc.ChromeOptions()
+        if self.headless:
+            options.add_argument('--headless=new')
+        # Save PDFs instead of opening the built-in viewer, so the crawler can capture them
+        options.add_experimental_option("prefs", {
+            "plugins.always_open_pdf_externally": True,
+            "download.prompt_for_download": False
+        })
+        return options
+
+    def _launch(self) -> BrowserSession:
+        with self._launch_lock:
+            print(f"🚀 Launching browser ({'headless' if self.headless else 'visible'})...")
+            return BrowserSession(uc.Chrome(options=self._options()))
+
+    @staticmethod
+    def _healthy(session: BrowserSession) -> bool:
+        if session.broken:
+            return False
+        try:
+            session.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(session: BrowserSession):
+        try:
+            session.driver.quit()
+        except Exception:
+            pass
+
+    def acquire(self, domain: str = "", timeout: float = None) -> BrowserSession:
+        """
+        Check out a session, preferring one that already knows the domain.
+        Blocks while all size sessions are busy.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Browser pool is shut down")
+                if self._idle:
+                    session = next((s for s in self._idle if domain in s.domains), self._idle[-1])
+                    self._idle.remove(session)
+                    if self._healthy(session):
+                        self._busy.add(session)
+                        return session
+                    print("♻️ Dropping unresponsive browser")
+                    self._quit(session)
+                    continue
+                if len(self._busy) < self.size:
+                    # Reserve the slot before launching outside the lock
+                    placeholder = object()
+                    self._busy.add(placeholder)
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("No browser available")
+                self._cond.wait(remaining)
+
+        try:
+            session = self._launch()
+        except Exception:
+            with self._cond:
+                self._busy.discard(placeholder)
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._busy.discard(placeholder)
+            self._busy.add(session)
+        return session
+
+    def release(self, session: BrowserSession, domain: str = ""):
+        """
+        Return a session. It is recycled once it has served max_pages pages or broke.
+        """
+        session.pages += 1
+        if domain:
+            session.domains.add(domain)
+            self._save_cookies(session, domain)
+
+        recycle = session.broken or session.pages >= self.max_pages
+        with self._cond:
+            self._busy.discard(session)
+            if recycle or self._closed:
+                self._quit(session)
+            else:
+                self._idle.append(session)
+            self._cond.notify()
+
+    def _save_cookies(self, session: BrowserSession, domain: str):
+        try:
+            cookies = session.driver.get_cookies()
+        except Exception:
+            return
+        if cookies:
+            with self._cond:
+                self._cookies[domain] = cookies
+
+    def _restore_cookies(self, session: BrowserSession, domain: str):
+        """
+        Inject cookies earned by a (possibly recycled) browser into a session that has
+        not visited the domain yet. Uses CDP so no navigation is needed first.
+        """
+        with self._cond:
+            cookies = self._cookies.get(domain)
+        if not cookies or domain in session.domains:
+            return
+        converted = []
+        for c in cookies:
+            cookie = {k: c[k] for k in ("name", "value", "domain", "path", "secure", "httpOnly") if k in c}
+            if "expiry" in c:
+                cookie["expires"] = c["expiry"]
+            converted.append(cookie)
+        try:
+            session.driver.execute_cdp_cmd("Network.setCookies", {"cookies": converted})
+        except Exception as e:
+            print(f"   Could not restore cookies for {domain}: {e}")
+
+    @contextmanager
+    def session(self, url: str):
+        """
+        with pool.session(url) as driver: ...
+        Marks the browser broken if the body raises a WebDriver-level error.
+        """
+        domain = HostLimiter.host_of(url)
+        session = self.acquire(domain)
+        self._restore_cookies(session, domain)
+        try:
+            yield session.driver
+        except Exception:
+            session.broken = not self._healthy(session)
+            raise
+        finally:
+            self.release(session, domain)
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+            sessions = list(self._idle) + [s for s in self._busy if isinstance(s, BrowserSession)]
+            self._idle.clear()
+            self._cond.notify_all()
+        for session in sessions:
+            self._quit(session)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_browser_pool(headless: bool = False, size: int = None) -> BrowserPool:
+    """
+    Process-wide pool (one for visible, one for headless browsers).
+    size only applies when the pool is first created.
+    """
+    with _pools_lock:
+        pool = _pools.get(headless)
+        if pool is None or pool._closed:
+            pool = BrowserPool(size=size, headless=headless)
+            _pools[headless] = pool
+        return pool
@@ -0,0 +1,62 @@
+import os
+import time
+
+from config import Config
+from utils.json_store import JsonStore
+
+KIND_CRAWL = "crawl"
+KIND_SCHOLAR = "scholar"
+
+
+class ChallengeQueue:
+    """
+    Persistent "needs human" queue of pages that hit a CAPTCHA / Cloudflare challenge.
+
+    The automated pipeline parks challenged items here and moves on; the operator
+    works through them later (see the "Needs human" section of the app), and a solved
+    item is removed once its paper has been downloaded.
+
+    Entries: {"kind", "url", "paper", "context", "reason", "queued_at", "attempts"}
+    - kind 'crawl': a landing page for one paper (paper holds the search result).
+    - kind 'scholar': a Scholar results page (context holds query / start / limit).
+    """
+
+    def __init__(self, path: str = None):
+        self.store = JsonStore(path or os.path.join(Config.CACHE_DIR, "challenge_queue.json"))
+
+    @staticmethod
+    def _key(kind: str, url: str) -> str:
+        return f"{kind}|{url}"
+
+    def add(self, url: str, kind: str = KIND_CRAWL, paper: dict = None, context: dict = None,
+            reason: str = "challenge") -> dict:
+        """
+        Park an item. Re-adding the same URL bumps its attempt count instead of duplicating it.
+        """
+        key = self._key(kind, url)
+        with self.store._lock:
+            entry = self.store.get(key) or {"kind": kind, "url": url, "queued_at": time.time(), "attempts": 0}
+            entry["attempts"] += 1
+            entry["reason"] = reason
+            if paper is not None:
+                # Only plain values survive the JSON round trip
+                entry["paper"] = {str(k): v for k, v in paper.items()
+                                  if isinstance(v, (str, int, float, bool, type(None)))}
+            if context is not None:
+                entry["context"] = context
+            self.store.set(key, entry)
+        print(f"🧑 Queued for a human ({kind}): {url}")
+        return entry
+
+    def pending(self, kind: str = None) -> list:
+        """
+        Queued items, oldest first.
+        """
+        entries = [entry for _, entry in self.store.items() if kind is None or entry.get("kind") == kind]
+        return sorted(entries, key=lambda e: e.get("queued_at", 0))
+
+    def remove(self, url: str, kind: str = KIND_CRAWL):
+        self.store.delete(self._key(kind, url))
+
+    def __len__(self):
+        return len(self.store)
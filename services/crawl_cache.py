@@ -0,0 +1,65 @@
+import os
+import time
+
+from config import Config
+from services.pdf_store import normalize_doi
+from utils.json_store import TTLCache
+
+
+class CrawlCache:
+    """
+    Persistent landing URL (and DOI) -> resolved PDF link cache for DeepPDFCrawler.
+
+    Each entry records the PDF link, which rule matched and when it was resolved,
+    and is checked before any HTTP or browser work.
+    """
+
+    def __init__(self, path: str = None, ttl: float = None):
+        self.cache = TTLCache(
+            path or os.path.join(Config.CACHE_DIR, "crawl_cache.json"),
+            Config.CRAWL_CACHE_TTL if ttl is None else ttl
+        )
+
+    @staticmethod
+    def _keys(url: str = None, doi: str = None) -> list:
+        keys = []
+        if url:
+            keys.append(f"url:{url.strip()}")
+        if normalize_doi(doi):
+            keys.append(f"doi:{normalize_doi(doi)}")
+        return keys
+
+    def get(self, url: str = None, doi: str = None):
+        """
+        Return {"pdf_url", "rule", "resolved_at", "landing_url"} or None.
+        """
+        for key in self._keys(url, doi):
+            entry = self.cache.get(key)
+            if entry:
+                return entry
+        return None
+
+    def put(self, url: str, pdf_url: str, rule: str = None, doi: str = None):
+        entry = {
+            "pdf_url": pdf_url,
+            "rule": rule,
+            "resolved_at": time.time(),
+            "landing_url": url
+        }
+        for key in self._keys(url, doi):
+            self.cache.set(key, entry, save=False)
+        self.cache.save()
+
+    def invalidate(self, url: str = None, doi: str = None, pdf_url: str = None):
+        """
+        Drop entries for a landing URL/DOI, or every entry pointing at pdf_url
+        (used when the cached link later fails to download).
+        """
+        for key in self._keys(url, doi):
+            self.cache.delete(key, save=False)
+        if pdf_url:
+            for key, record in self.cache.items():
+                value = record.get("value") if isinstance(record, dict) else None
+                if value and value.get("pdf_url") == pdf_url:
+                    self.cache.delete(key, save=False)
+        self.cache.save()
@@ -1,23 +1,39 @@
 
 import time
-from bs4 import BeautifulSoup
-import re
 import urllib.parse
 import os
+import base64
+import hashlib
+import shutil
+import tempfile
 try:
     import winsound
     SOUND_AVAILABLE = True
 except ImportError:
     SOUND_AVAILABLE = False
 
-try:
-    import undetected_chromedriver as uc
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    SELENIUM_AVAILABLE = True
-except ImportError:
-    SELENIUM_AVAILABLE = False
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+
+from config import Config
+from services.browser_pool import get_browser_pool, SELENIUM_AVAILABLE
+from services.http_client import get_http_client
+from services.crawl_cache import CrawlCache
+from services.downloader_service import PDF_MAGIC, SNIFF_BYTES
+from services.domain_rules import DomainRules, get_domain_rules, parse_page
+from utils.concurrency import HostLimiter
+
+CHALLENGE_TITLE_INDICATORS = [
+    "challenge", "security check", "verify you are human", "captcha", 
+    "cloudflare", "human verification", "please wait", "ddos protection",
+    "just a moment", "attention required", "access denied"
+]
+# Vendor fingerprints in the HTML of interstitials served with 403/429/503
+CHALLENGE_HTML_MARKERS = [
+    "cf-challenge", "challenge-platform", "cf_chl_", "g-recaptcha", "h-captcha",
+    "px-captcha", "_incapsula_", "captcha-delivery"
+]
 
 class DeepPDFCrawler:
     """
@@ -25,168 +41,434 @@ class DeepPDFCrawler:
     Simulates behavior similar to Zotero translators.
     """
     
-    def __init__(self):
-        pass
+    def __init__(self, pool=None, http_client=None, cache: CrawlCache = None, rules: DomainRules = None):
+        # Browsers are borrowed from a long-lived pool instead of launched per URL
+        self._pool = pool
+        self.http = http_client or get_http_client()
+        # Landing URL / DOI -> PDF link, consulted before any network work
+        self.cache = cache or CrawlCache()
+        # Publisher rules, precompiled and indexed by host suffix
+        self.rules = rules or get_domain_rules()
+        # Which tier resolved each URL: 'cache', 'http', 'browser', 'challenged' or 'unresolved'
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
 
-    
-    # Domain-specific rules for finding PDF links
-    # Key: partial domain string
-    # Value: Dict with 'selector' (css), 'attribute' (default href), 'base_url_needed' (bool)
-    DOMAIN_RULES = {
-        'arxiv.org': [
-            {'selector': 'a.download-pdf', 'type': 'selector'},
-            {'selector': 'a[href^="/pdf/"]', 'type': 'selector'} # Fallback
-        ],
-        'jmir.org': [
-            {'selector': 'a[href$="/PDF"]', 'type': 'selector'},
-            {'selector': 'a[aria-label="Download PDF"]', 'type': 'selector'}
-        ],
-        'springer.com': [
-            {'selector': 'a.c-pdf-download__link', 'type': 'selector'},
-            {'selector': 'a[data-track-action="download pdf"]', 'type': 'selector'}
-        ],
-        'biomedcentral.com': [ # Similar to Springer usually
-             {'selector': 'a.c-pdf-download__link', 'type': 'selector'}
-        ],
-        'sciencedirect.com': [
-            {'selector': 'a[aria-label*="View PDF"]', 'type': 'selector'}, # "View PDF. Opens in a new window."
-            {'selector': 'a.link-button-primary', 'content_text': 'PDF', 'type': 'heuristic'} # Complex SVG inside
-        ],
-        'ieee.org': [
-            {'selector': 'a.xpl-btn-pdf', 'type': 'selector'},
-            {'selector': 'iframe', 'attribute': 'src', 'contains': 'pdf', 'type': 'iframe_heuristic'} # Sometimes IEEE embeds
-        ],
-        'nature.com': [
-            {'selector': 'a.c-pdf-download__link', 'type': 'selector'},
-            {'selector': 'a[data-test="download-pdf"]', 'type': 'selector'}
-        ],
-        'researchgate.net': [
-             # ResearchGate pages often redirect or have a "Download full-text PDF" button
-             {'selector': 'a.js-download-full-text', 'type': 'selector'},
-             {'selector': 'a[href*="publication"]', 'text_contains': 'Download', 'type': 'heuristic'}
-        ]
-    }
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = get_browser_pool()
+        return self._pool
+
+    def _extract_pdf_link(self, soup, url: str):
+        """
+        Run domain rules, meta tags and the generic link scan against a parsed page.
+        Returns (pdf_url, how) or (None, None).
+        """
+        # 1. Check Domain Rules First
+        found_pdf_url, how = self.rules.apply(soup, url)
+        if found_pdf_url:
+            print(f"   ✅ Found via {how}: {found_pdf_url}")
+            return found_pdf_url, how
+
+        # 2. Heuristics / Meta tags (Fallback)
+        meta_pdf = soup.find('meta', attrs={'name': 'citation_pdf_url'})
+        if meta_pdf and meta_pdf.get('content'):
+            found_pdf_url = urllib.parse.urljoin(url, meta_pdf.get('content'))
+            print(f"   ✅ Found meta citation_pdf_url: {found_pdf_url}")
+            return found_pdf_url, "meta:citation_pdf_url"
+
+        # 3. Generic Scan (Last Resort)
+        candidates = []
+        for a in soup.find_all('a', href=True):
+            href = a['href']
+            # Ignore common non-pdf links
+            if 'mailto:' in href or 'javascript:' in href: continue
+            
+            full_url = urllib.parse.urljoin(url, href)
+            score = 0
+            
+            # Strong signals
+            if full_url.lower().endswith('.pdf'): score += 10
+            if 'pdf' in a.text.lower(): score += 5
+            if 'download' in a.text.lower(): score += 2
+            
+            if score >= 5: # Threshold
+                candidates.append((score, full_url))
+        
+        if candidates:
+            candidates.sort(key=lambda x: x[0], reverse=True)
+            print(f"   ✅ Found heuristic candidate: {candidates[0][1]}")
+            return candidates[0][1], "heuristic:link_score"
+
+        return None, None
 
-    def find_pdf_link(self, url: str, interactive: bool = False, sound_alert: bool = False) -> str:
+    @staticmethod
+    def _looks_like_challenge(title: str, html: str = "", status_code: int = 200) -> bool:
+        """
+        Cheap challenge/CAPTCHA detection on a page title plus a few vendor markers.
+        """
+        title = (title or "").lower()
+        if any(ind in title for ind in CHALLENGE_TITLE_INDICATORS):
+            return True
+        if status_code in (403, 429, 503):
+            head = (html or "")[:50000].lower()
+            return any(marker in head for marker in CHALLENGE_HTML_MARKERS)
+        return False
+
+    def _record(self, tier: str):
+        with self._stats_lock:
+            self.stats[tier] += 1
+
+    def _try_http(self, url: str):
+        """
+        Tier 1: plain GET + static HTML parse, no browser.
+        Returns (pdf_url, how, status) with status in 'found', 'not_found', 'challenge', 'error'.
+        The response is streamed: a PDF or other binary "landing page" is judged by its
+        headers alone, and HTML is read up to CRAWL_MAX_HTML_BYTES.
+        """
+        try:
+            # No retries: a 503 here is usually a challenge page, the browser tier handles it
+            response = self.http.get(url, timeout=15, retries=0, stream=True)
+        except Exception as e:
+            print(f"   HTTP fast path failed: {e}")
+            return None, None, "error"
+
+        try:
+            content_type = response.headers.get('Content-Type', '').lower()
+            if 'application/pdf' in content_type:
+                # The "landing page" is the PDF itself
+                return response.url, "http:content-type", "found"
+            if 'html' not in content_type:
+                return None, None, "not_found"
+
+            body = b''
+            for chunk in response.iter_content(chunk_size=65536):
+                body += chunk
+                if len(body) >= Config.CRAWL_MAX_HTML_BYTES:
+                    break
+        except Exception as e:
+            print(f"   HTTP fast path failed: {e}")
+            return None, None, "error"
+        finally:
+            response.close()
+
+        html = body.decode(response.encoding or 'utf-8', errors='replace')
+        soup = parse_page(html)
+        title = soup.title.get_text() if soup.title else ""
+        if self._looks_like_challenge(title, html, response.status_code):
+            print(f"   🛡️ Challenge page detected over HTTP (HTTP {response.status_code})")
+            return None, None, "challenge"
+        if response.status_code != 200:
+            return None, None, "error"
+
+        # Relative links resolve against the final URL after redirects
+        found, how = self._extract_pdf_link(soup, response.url)
+        return found, how, ("found" if found else "not_found")
+
+    def find_pdf_link(self, url: str, interactive: bool = False, sound_alert: bool = False,
+                      fast_path: bool = True, doi: str = None, use_cache: bool = True) -> str:
         """
         Visits the URL and attempts to return a direct PDF link.
+        Previously resolved landing pages (or DOIs) are answered from self.cache.
+        Tier 1 is a plain HTTP fetch; the browser is only started when that finds
+        nothing or hits a challenge page. self.stats counts which tier resolved each URL.
         """
-        if not SELENIUM_AVAILABLE:
-            print("❌ Selenium/Undetected-Chromedriver not available")
-            return None
+        found, _, _ = self._resolve(url, interactive=interactive, sound_alert=sound_alert, fast_path=fast_path,
+                                    doi=doi, use_cache=use_cache)
+        return found
+
+    def find_pdf(self, url: str, capture_dir: str, interactive: bool = False, sound_alert: bool = False,
+                 fast_path: bool = True, doi: str = None):
+        """
+        Like find_pdf_link, but when the link is found in the browser the PDF is also
+        downloaded inside that session (same cookies / Cloudflare clearance) into capture_dir.
+
+        Returns:
+            (pdf_url, filepath, status): filepath is None when nothing was captured, e.g. the
+            link came from the cache or the HTTP tier, where a plain download works.
+            status is 'found', 'not_found', 'challenge' or 'error'; without interactive a
+            challenge is reported immediately so the caller can park the page for a human.
+        """
+        found, status, captured = self._resolve(url, interactive=interactive, sound_alert=sound_alert,
+                                                fast_path=fast_path, doi=doi, capture_dir=capture_dir)
+        return found, captured, status
+
+    def _resolve(self, url: str, interactive: bool = False, sound_alert: bool = False,
+                 fast_path: bool = True, pool=None, doi: str = None, use_cache: bool = True,
+                 capture_dir: str = None):
+        """
+        Shared implementation of find_pdf_link / find_pdf / find_pdf_links.
+        Returns (pdf_url, status, captured_path) with status in 'found', 'not_found',
+        'challenge', 'error'.
+        """
+        if use_cache:
+            cached = self.cache.get(url, doi)
+            if cached:
+                print(f"   ⚡ Crawl cache hit ({cached.get('rule')}): {cached['pdf_url']}")
+                self._record("cache")
+                return cached["pdf_url"], "found", None
 
         print(f"🕵️ Deep Crawl: Visiting {url}...")
+
+        if fast_path:
+            found, how, status = self._try_http(url)
+            if found:
+                self._record("http")
+                self.cache.put(url, found, rule=how, doi=doi)
+                return found, "found", None
+            print(f"   ↗ Escalating to browser ({status})")
+
+        if not SELENIUM_AVAILABLE:
+            print("❌ Selenium/Undetected-Chromedriver not available")
+            self._record("unresolved")
+            return None, "error", None
         
         try:
-            options = uc.ChromeOptions()
-            # options.add_argument('--headless') # Keep visible
-            
-            driver = uc.Chrome(options=options)
             found_pdf_url = None
+            captured = None
             
-            try:
+            with (pool or self.pool).session(url) as driver:
                 driver.get(url)
+                probes = self._ready_probes(url)
+                state = self._wait_until_ready(driver, probes)
                 
                 # Handling Interactive Mode (Cloudflare / CAPTCHAs)
-                if interactive:
+                if state == "challenge" and interactive:
                     max_wait = 300 # 5 minutes max wait
-                    waited = 0
-                    while waited < max_wait:
-                        # Check for common challenge indicators
-                        page_src = driver.page_source.lower()
-                        title = driver.title.lower()
-                        blocked = False
-                        
-                        indicators = [
-                            "challenge", "security check", "verify you are human", "captcha", 
-                            "cloudflare", "human verification", "please wait", "ddos protection",
-                            "just a moment"
-                        ]
-                        
-                        # Strong indicators in title or specific elements
-                        if any(ind in title for ind in indicators):
-                            blocked = True
-                        
-                        # Cloudflare specific
-                        try:
-                            if driver.find_element(By.ID, "challenge-running"): blocked = True
-                        except: pass
-                        
-                        if blocked:
-                            if waited % 5 == 0:
-                                print(f"⚠️  Detectado Bloqueo/Captcha. Esperando al usuario... ({waited}s)")
-                                if sound_alert and SOUND_AVAILABLE:
-                                    # Play a system sound (Frequency 1000Hz, Duration 500ms)
-                                    try:
-                                        winsound.Beep(1000, 500)
-                                    except:
-                                        pass
-                            time.sleep(2)
-                            waited += 2
-                        else:
-                            if waited > 0:
-                                print("✅ Bloqueo superado. Continuando...")
-                                time.sleep(2) # Extra buffer
-                            break
-                else:
-                    time.sleep(5) # Standard wait
-                
-                soup = BeautifulSoup(driver.page_source, 'html.parser')
-                current_domain = urllib.parse.urlparse(url).netloc
-                
-                # 1. Check Domain Rules First
-                for domain_key, rules in self.DOMAIN_RULES.items():
-                    if domain_key in current_domain:
-                        print(f"   Matched domain rule: {domain_key}")
-                        for rule in rules:
+                    started = time.monotonic()
+                    next_alert = started
+                    print(f"⚠️  Detectado Bloqueo/Captcha. Esperando al usuario...")
+                    while state == "challenge" and time.monotonic() - started < max_wait:
+                        if sound_alert and SOUND_AVAILABLE and time.monotonic() >= next_alert:
+                            # Play a system sound (Frequency 1000Hz, Duration 500ms)
                             try:
-                                if rule['type'] == 'selector':
-                                    element = soup.select_one(rule['selector'])
-                                    if element and element.has_attr('href'):
-                                        found_pdf_url = urllib.parse.urljoin(url, element['href'])
-                                        print(f"   ✅ Found via rule {rule['selector']}: {found_pdf_url}")
-                                        break
-                            except Exception as e:
-                                print(f"   Rule error: {e}")
-                                
-                    if found_pdf_url: break
-
-                # 2. Heuristics / Meta tags (Fallback)
-                if not found_pdf_url:
-                    meta_pdf = soup.find('meta', attrs={'name': 'citation_pdf_url'})
-                    if meta_pdf:
-                        found_pdf_url = meta_pdf.get('content')
-                        print(f"   ✅ Found meta citation_pdf_url: {found_pdf_url}")
-
-                # 3. Generic Scan (Last Resort)
-                if not found_pdf_url:
-                    candidates = []
-                    for a in soup.find_all('a', href=True):
-                        href = a['href']
-                        # Ignore common non-pdf links
-                        if 'mailto:' in href or 'javascript:' in href: continue
-                        
-                        full_url = urllib.parse.urljoin(url, href)
-                        score = 0
-                        
-                        # Strong signals
-                        if full_url.lower().endswith('.pdf'): score += 10
-                        if 'pdf' in a.text.lower(): score += 5
-                        if 'download' in a.text.lower(): score += 2
-                        
-                        if score >= 5: # Threshold
-                            candidates.append((score, full_url))
-                    
-                    if candidates:
-                        candidates.sort(key=lambda x: x[0], reverse=True)
-                        found_pdf_url = candidates[0][1]
-                        print(f"   ✅ Found heuristic candidate: {found_pdf_url}")
-
-            finally:
-                driver.quit()
+                                winsound.Beep(1000, 500)
+                            except:
+                                pass
+                            next_alert += 5
+                        # Cheap DOM probe every second instead of re-serializing the page
+                        time.sleep(1)
+                        state = self._wait_until_ready(driver, probes, timeout=0)
+                    if state != "challenge":
+                        print("✅ Bloqueo superado. Continuando...")
+                        state = self._wait_until_ready(driver, probes)
+
+                if state == "challenge":
+                    # Nobody solved it: report instead of waiting
+                    print(f"   🛡️ Challenge page in browser: {url}")
+                    self._record("challenged")
+                    return None, "challenge", None
                 
-            return found_pdf_url
+                soup = parse_page(driver.page_source)
+                found_pdf_url, how = self._extract_pdf_link(soup, driver.current_url or url)
+                if found_pdf_url and capture_dir:
+                    captured = self.capture_pdf(driver, found_pdf_url, capture_dir)
+
+            self._record("browser" if found_pdf_url else "unresolved")
+            if found_pdf_url:
+                self.cache.put(url, found_pdf_url, rule=f"browser:{how}", doi=doi)
+            return found_pdf_url, ("found" if found_pdf_url else "not_found"), captured
             
         except Exception as e:
             print(f"Deep Crawl Error: {e}")
+            self._record("unresolved")
+            return None, "error", None
+
+    # Runs inside the page so the request carries the session's cookies.
+    # The body comes back base64-encoded (chunked to stay under the argument limit).
+    _FETCH_PDF_JS = """
+        var url = arguments[0], maxBytes = arguments[1], done = arguments[arguments.length - 1];
+        fetch(url, {credentials: 'include'}).then(function (r) {
+            if (!r.ok) { done({error: 'HTTP ' + r.status}); return; }
+            var length = parseInt(r.headers.get('content-length') || '0', 10);
+            if (maxBytes && length > maxBytes) { done({error: 'too large'}); return; }
+            return r.arrayBuffer().then(function (buf) {
+                var bytes = new Uint8Array(buf), bin = '';
+                for (var i = 0; i < bytes.length; i += 0x8000) {
+                    bin += String.fromCharCode.apply(null, bytes.subarray(i, i + 0x8000));
+                }
+                done({data: btoa(bin)});
+            });
+        }).catch(function (e) { done({error: String(e)}); });
+    """
+
+    def capture_pdf(self, driver, pdf_url: str, capture_dir: str):
+        """
+        Download pdf_url inside an open browser session.
+        Tries an in-page fetch() first and falls back to a CDP-controlled browser
+        download (needed when the PDF lives on another origin and CORS blocks fetch).
+        Returns the path of a finished, hidden .pdf file in capture_dir, or None.
+        """
+        os.makedirs(capture_dir, exist_ok=True)
+        dest = os.path.join(capture_dir, f".capture-{hashlib.sha1(pdf_url.encode('utf-8')).hexdigest()}.pdf")
+
+        data = None
+        try:
+            driver.set_script_timeout(Config.CRAWL_CAPTURE_TIMEOUT)
+            result = driver.execute_async_script(self._FETCH_PDF_JS, pdf_url, Config.DOWNLOAD_MAX_BYTES) or {}
+            if result.get("data"):
+                data = base64.b64decode(result["data"])
+            else:
+                print(f"   In-page fetch failed: {result.get('error')}")
+        except Exception as e:
+            print(f"   In-page fetch failed: {e}")
+
+        if data is not None:
+            if PDF_MAGIC in data[:SNIFF_BYTES]:
+                with open(dest, "wb") as f:
+                    f.write(data)
+                print(f"   📥 Captured PDF in browser ({len(data)} bytes)")
+                return dest
+            print("   In-page fetch did not return a PDF")
+
+        return self._capture_via_download(driver, pdf_url, dest)
+
+    def _capture_via_download(self, driver, pdf_url: str, dest: str):
+        """
+        Let Chrome save the PDF itself into a scratch directory, then move it to dest.
+        """
+        scratch = tempfile.mkdtemp(prefix=".capture-", dir=os.path.dirname(dest))
+        try:
+            driver.execute_cdp_cmd("Page.setDownloadBehavior", {"behavior": "allow", "downloadPath": scratch})
+            driver.get(pdf_url)
+            deadline = time.monotonic() + Config.CRAWL_CAPTURE_TIMEOUT
+            while time.monotonic() < deadline:
+                finished = [f for f in os.listdir(scratch) if not f.endswith(".crdownload")]
+                if finished:
+                    path = os.path.join(scratch, finished[0])
+                    with open(path, "rb") as f:
+                        head = f.read(SNIFF_BYTES)
+                    if PDF_MAGIC not in head:
+                        print("   Browser download is not a PDF")
+                        return None
+                    shutil.move(path, dest)
+                    print("   📥 Captured PDF via browser download")
+                    return dest
+                time.sleep(Config.CRAWL_POLL_INTERVAL)
+            print("   Browser download timed out")
+            return None
+        except Exception as e:
+            print(f"   Browser download failed: {e}")
             return None
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    def _ready_probes(self, url: str) -> list:
+        """
+        Rule matches whose presence means the page is ready to be parsed. Loose
+        heuristic selectors (a bare 'iframe') only count with their text/contains filter.
+        """
+        return self.rules.probes_for(url) + [
+            {"selector": 'meta[name="citation_pdf_url"]', "attribute": "content", "text": None, "contains": None}
+        ]
+
+    # One round trip per probe: title, readiness, challenge markers and rule matches
+    _PAGE_STATE_JS = """
+        var probes = arguments[0];
+        function matches(el, probe) {
+            var value = el.getAttribute(probe.attribute);
+            if (!value) return false;
+            if (probe.contains && value.toLowerCase().indexOf(probe.contains) < 0) return false;
+            if (probe.text) {
+                var text = [el.textContent || '', el.getAttribute('aria-label') || '', el.getAttribute('title') || '']
+                    .join(' ').replace(/\\s+/g, ' ').toLowerCase();
+                if (text.indexOf(probe.text) < 0) return false;
+            }
+            return true;
+        }
+        var found = false;
+        for (var i = 0; i < probes.length && !found; i++) {
+            try {
+                var elements = document.querySelectorAll(probes[i].selector);
+                for (var j = 0; j < elements.length && !found; j++) {
+                    found = matches(elements[j], probes[i]);
+                }
+            } catch (e) {}
+        }
+        return {
+            title: document.title || '',
+            ready: document.readyState,
+            challenge: document.getElementById('challenge-running') !== null
+                || document.getElementById('challenge-form') !== null,
+            found: found
+        };
+    """
+
+    def _wait_until_ready(self, driver, probes: list, timeout: float = None) -> str:
+        """
+        Poll the DOM until a rule match / citation_pdf_url appears ("found"),
+        a challenge is detected ("challenge"), or the document has been complete for
+        CRAWL_SETTLE_SECONDS ("loaded"). Returns "timeout" otherwise.
+        """
+        timeout = Config.CRAWL_READY_TIMEOUT if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        complete_since = None
+        while True:
+            try:
+                page = driver.execute_script(self._PAGE_STATE_JS, probes) or {}
+            except Exception:
+                page = {}
+            if page.get("found"):
+                return "found"
+            if page.get("challenge") or self._looks_like_challenge(page.get("title", "")):
+                return "challenge"
+            now = time.monotonic()
+            if page.get("ready") == "complete":
+                complete_since = complete_since or now
+                # Give late scripts a moment to inject the PDF button
+                if now - complete_since >= Config.CRAWL_SETTLE_SECONDS:
+                    return "loaded"
+            if now >= deadline:
+                return "timeout"
+            time.sleep(Config.CRAWL_POLL_INTERVAL)
+
+    def find_pdf_links(self, urls: list, max_workers: int = None, per_domain: int = None,
+                       progress_callback=None, capture_dir: str = None):
+        """
+        Headless batch mode: resolve many landing pages concurrently.
+
+        Work is spread over the headless browser pool (one tab per worker browser),
+        with at most per_domain concurrent visits per host spaced CRAWL_DOMAIN_DELAY apart.
+        Challenge pages are never waited on. With capture_dir, PDFs found in the browser
+        are downloaded in the same session (see find_pdf).
+
+        Returns:
+            (links, challenged, captured): {url: pdf_url or None}, the list of URLs that hit
+            a challenge (to be retried interactively) and {url: captured filepath}.
+        """
+        max_workers = max_workers or Config.CRAWL_BATCH_WORKERS
+        pool = get_browser_pool(headless=True, size=max_workers)
+        limiter = HostLimiter(per_domain or Config.CRAWL_PER_DOMAIN, min_interval=Config.CRAWL_DOMAIN_DELAY)
+        urls = list(dict.fromkeys(u for u in urls if u))
+
+        def _run(url):
+            cached = self.cache.get(url)
+            if cached:
+                # Answered locally: no need to wait for a politeness slot
+                self._record("cache")
+                return cached["pdf_url"], "found", None
+            with limiter.limit(url):
+                return self._resolve(url, interactive=False, pool=pool, use_cache=False,
+                                     capture_dir=capture_dir)
+
+        links = {}
+        challenged = []
+        captured = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(_run, url): url for url in urls}
+            for done, future in enumerate(as_completed(futures), start=1):
+                url = futures[future]
+                try:
+                    found, status, filepath = future.result()
+                except Exception as e:
+                    print(f"Deep Crawl Error: {e}")
+                    found, status, filepath = None, "error", None
+                links[url] = found
+                if filepath:
+                    captured[url] = filepath
+                if status == "challenge":
+                    challenged.append(url)
+                if progress_callback:
+                    progress_callback(done, len(urls), url, found)
+
+        return links, challenged, captured
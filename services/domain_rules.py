@@ -0,0 +1,157 @@
+import json
+import os
+import urllib.parse
+
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer
+
+from config import Config
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "domain_rules.json")
+
+# Everything the extractors look at; the rest of the DOM is never built
+PAGE_TAGS = ["title", "meta", "a", "iframe"]
+_PAGE_STRAINER = SoupStrainer(PAGE_TAGS)
+
+
+def parse_page(html: str) -> BeautifulSoup:
+    """
+    Parse only <title>, <meta>, <a> and <iframe> elements of a page,
+    with lxml when it is installed.
+    """
+    return BeautifulSoup(html or "", HTML_PARSER, parse_only=_PAGE_STRAINER)
+
+
+class DomainRule:
+    """
+    One precompiled rule. Types:
+    - selector: first element matching the CSS selector that has the attribute.
+    - heuristic: like selector, but the element text (or aria-label/title) must
+      contain content_text / text_contains (case-insensitive).
+    - iframe_heuristic: the attribute (default src) must contain the given substring.
+    """
+
+    TYPES = ("selector", "heuristic", "iframe_heuristic")
+
+    def __init__(self, domain: str, spec: dict):
+        self.domain = domain
+        self.type = spec.get("type", "selector")
+        if self.type not in self.TYPES:
+            raise ValueError(f"Unknown rule type '{self.type}' for {domain}")
+        self.selector = spec["selector"]
+        self.compiled = soupsieve.compile(self.selector)
+        default_attr = "src" if self.type == "iframe_heuristic" else "href"
+        self.attribute = spec.get("attribute", default_attr)
+        text = spec.get("content_text") or spec.get("text_contains")
+        self.text = text.lower() if text else None
+        self.contains = (spec.get("contains") or "").lower() or None
+        self.name = f"rule:{domain}:{self.selector}"
+
+    def probe(self) -> dict:
+        """
+        The same match as apply(), as plain data for the in-browser readiness check.
+        """
+        return {
+            "selector": self.selector,
+            "attribute": self.attribute,
+            "text": self.text if self.type == "heuristic" else None,
+            "contains": self.contains if self.type == "iframe_heuristic" else None
+        }
+
+    @staticmethod
+    def _element_text(element) -> str:
+        parts = [element.get_text(" ", strip=True), element.get("aria-label", ""), element.get("title", "")]
+        return " ".join(p for p in parts if p).lower()
+
+    def apply(self, soup, url: str):
+        """
+        Return the absolute link this rule finds on the page, or None.
+        """
+        if self.type == "selector":
+            for element in self.compiled.iselect(soup):
+                if element.get(self.attribute):
+                    return urllib.parse.urljoin(url, element[self.attribute])
+            return None
+
+        for element in self.compiled.iselect(soup):
+            value = element.get(self.attribute)
+            if not value:
+                continue
+            if self.type == "heuristic" and self.text and self.text not in self._element_text(element):
+                continue
+            if self.type == "iframe_heuristic" and self.contains and self.contains not in value.lower():
+                continue
+            return urllib.parse.urljoin(url, value)
+        return None
+
+
+class DomainRules:
+    """
+    Publisher rules loaded from a JSON file and indexed by host suffix, so a page
+    only runs the rules of its own domain (www.link.springer.com -> springer.com).
+    """
+
+    def __init__(self, rules: dict):
+        self.index = {}
+        for domain, specs in rules.items():
+            if domain.startswith("_"):
+                continue
+            compiled = []
+            for spec in specs:
+                try:
+                    compiled.append(DomainRule(domain, spec))
+                except Exception as e:
+                    print(f"⚠️ Skipping invalid rule for {domain}: {e}")
+            self.index[domain.lower().lstrip(".")] = compiled
+
+    @classmethod
+    def load(cls, path: str = None) -> "DomainRules":
+        with open(path or DEFAULT_RULES_PATH, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def rules_for(self, url: str) -> list:
+        """
+        Rules of every indexed suffix of the URL's host, most specific first.
+        """
+        host = urllib.parse.urlparse(url).hostname or ""
+        labels = host.lower().split(".")
+        matched = []
+        for i in range(len(labels)):
+            matched.extend(self.index.get(".".join(labels[i:]), []))
+        return matched
+
+    def probes_for(self, url: str) -> list:
+        return [rule.probe() for rule in self.rules_for(url)]
+
+    def apply(self, soup, url: str):
+        """
+        Returns (pdf_url, rule_name) for the first rule that matches, or (None, None).
+        """
+        for rule in self.rules_for(url):
+            try:
+                found = rule.apply(soup, url)
+            except Exception as e:
+                print(f"   Rule error: {e}")
+                continue
+            if found:
+                return found, rule.name
+        return None, None
+
+
+_default_rules = None
+
+
+def get_domain_rules() -> DomainRules:
+    """
+    Shared rule set, compiled once per process from Config.DOMAIN_RULES_FILE.
+    """
+    global _default_rules
+    if _default_rules is None:
+        _default_rules = DomainRules.load(Config.DOMAIN_RULES_FILE or None)
+    return _default_rules
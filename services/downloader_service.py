@@ -1,7 +1,11 @@
 import os
 import sys
-import requests
+import hashlib
+import json
 import re
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from scihub import SciHub
 
 # Add parent directory to path to import brother packages
@@ -9,66 +13,357 @@ from scihub import SciHub
 # Add parent directory to path to import sibling packages
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
+from config import Config
+from utils.concurrency import HostLimiter
+from services.pdf_store import PDFStore, ids_from_paper
+from services.http_client import get_http_client
+from services.negative_cache import NegativeCache, REASON_KNOWN_FAILURE
+from services.strategy_stats import StrategyStats
+from services.unpaywall_service import UnpaywallService
+
+# Machine-readable failure reasons carried in result["reason"]
+REASON_HTTP_ERROR = "http_error"
+REASON_TOO_LARGE = "too_large"
+REASON_STALLED = "stalled"
+REASON_INTERRUPTED = "interrupted"
+REASON_NOT_PDF = "not_pdf"
+REASON_NOT_FOUND = "not_found"
+# The page asked for a human (CAPTCHA/Cloudflare): says nothing about the strategy itself
+REASON_CHALLENGE = "challenge"
+
+# Content-Types a real PDF may arrive with; anything else (text/html login walls...) is rejected
+PDF_CONTENT_TYPES = ("application/pdf", "application/x-pdf", "application/octet-stream",
+                     "binary/octet-stream", "application/force-download", "application/download")
+PDF_MAGIC = b"%PDF-"
+# The spec tolerates some leading garbage before the header
+SNIFF_BYTES = 1024
+
+
+class DownloadAborted(Exception):
+    """
+    A transfer that must not be retried (size cap, stalled throughput...).
+    """
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+class _RetryTransfer(Exception):
+    """
+    A transfer attempt that ended early but can be resumed or restarted.
+    """
+
+
 class DownloaderService:
-    def __init__(self, download_dir: str = "downloaded_papers"):
+    def __init__(self, download_dir: str = "downloaded_papers", per_host_limit: int = None, http_client=None,
+                 negative_cache: NegativeCache = None, strategy_stats: StrategyStats = None,
+                 unpaywall: UnpaywallService = None):
         self.download_dir = download_dir
         if not os.path.exists(self.download_dir):
             os.makedirs(self.download_dir)
+        # Shared across all threads of download_many so a single publisher is never hammered
+        self.host_limiter = HostLimiter(per_host_limit or Config.DOWNLOAD_PER_HOST)
+        # Content-addressed storage + DOI/arXiv/URL/title index (skips re-downloads)
+        self.store = PDFStore(self.download_dir)
+        # Pooled keep-alive session with retry/backoff shared by every service
+        self.http = http_client or get_http_client()
+        # Strategies that already failed for a DOI/URL are skipped until their TTL expires
+        self.negative_cache = negative_cache or NegativeCache()
+        # Per-domain/per-source success rates used to reorder strategies
+        self.strategy_stats = strategy_stats or StrategyStats()
+        # Cached DOI -> OA PDF location lookups
+        self.unpaywall = unpaywall or UnpaywallService(http_client=self.http)
 
+    @staticmethod
+    def _cache_hit(filepath: str) -> dict:
+        return {
+            "success": True,
+            "filepath": filepath,
+            "source": "Cache",
+            "message": "Already downloaded",
+            "cached": True
+        }
+
+    def find_cached(self, paper: dict) -> dict:
+        """
+        Return a cache-hit result if any identifier of the paper is already stored, else None.
+        """
+        path = self.store.lookup_paper(paper)
+        return self._cache_hit(path) if path else None
 
-    
-    def download_from_url(self, url: str, filename: str) -> dict:
+    def ingest_file(self, filepath: str, paper: dict, source: str, urls: list = None) -> dict:
+        """
+        Move a file downloaded by another component (e.g. the ArXiv library) into the store.
+        """
+        stored = self.store.add_paper_file(filepath, paper, urls=urls)
+        return {
+            "success": True,
+            "filepath": stored,
+            "source": source,
+            "message": "Download successful"
+        }
+
+    def _temp_path(self, key: str, suffix: str = ".tmp") -> str:
+        # Hidden, non-.pdf name so half-written files never show up as papers
+        return os.path.join(self.download_dir, f".{hashlib.sha1(key.encode('utf-8')).hexdigest()}{suffix}")
+
+    def download_from_url(self, url: str, filename: str, paper: dict = None) -> dict:
         """
         Download a PDF directly from a URL.
+        filename is the paper title; the stored file is named by the PDFStore.
         """
+        ids = ids_from_paper(paper or {"Title": filename})
+        cached = self.store.lookup(doi=ids["doi"], arxiv_id=ids["arxiv_id"], urls=[url], title=ids["title"])
+        if cached:
+            return self._cache_hit(cached)
+
+        known = self.negative_cache.check("direct", url)
+        if known:
+            return self.negative_cache.skipped_result(known, "Direct URL")
+
         print(f"Direct download from: {url}")
         try:
-            # Headers to mimic a browser
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            }
-            
-            response = requests.get(url, headers=headers, stream=True, timeout=30)
-            
-            if response.status_code == 200:
-                # Ensure extension
-                if not filename.endswith('.pdf'):
-                    filename += '.pdf'
-                    
-                # Sanitize filename
-                filename = re.sub(r'[^\w\s-]', '', filename).strip() + ".pdf"
-                filepath = os.path.join(self.download_dir, filename)
+            with self.host_limiter.limit(url):
+                res = self._fetch_pdf(url, ids)
                 
-                with open(filepath, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                        
+        except Exception as e:
+            res = {
+                "success": False,
+                "filepath": None,
+                "message": str(e),
+                "source": "Direct URL"
+            }
+
+        self.negative_cache.record("direct", url, res)
+        return res
+
+    def _fetch_pdf(self, url: str, ids: dict) -> dict:
+        """
+        Perform the actual GET for download_from_url (caller holds the host slot).
+
+        Bytes go to a hidden .part file that is only moved into the store once complete.
+        Interrupted transfers resume with a Range request (guarded by If-Range) when the
+        server supports it; otherwise they restart from zero. A connection error or timeout
+        that made no progress is final: the HTTP client already retried that request.
+        """
+        part_path = self._temp_path(url, ".part")
+        meta_path = part_path + ".json"
+        last_error = None
+
+        for attempt in range(Config.DOWNLOAD_RESUME_ATTEMPTS + 1):
+            size_before = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            try:
+                # Resume attempts get no client-side retries of their own
+                error = self._stream_to_part(url, part_path, meta_path, retries=0 if attempt else None)
+            except DownloadAborted as e:
+                print(f"   ⛔ Aborted: {e}")
                 return {
-                    "success": True,
-                    "filepath": filepath,
+                    "success": False,
+                    "filepath": None,
+                    "message": str(e),
                     "source": "Direct URL",
-                    "message": "Download successful"
+                    "reason": e.reason
                 }
+            except (_RetryTransfer, requests.exceptions.ConnectionError,
+                    requests.exceptions.ChunkedEncodingError, requests.exceptions.Timeout) as e:
+                last_error = e
+                done = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+                if not isinstance(e, _RetryTransfer) and done <= size_before:
+                    raise
+                print(f"   ⏸ Transfer interrupted ({e}). Resuming at byte {done}...")
+                continue
+
+            if error:
+                return error
+
+            if os.path.exists(meta_path):
+                os.remove(meta_path)
+            filepath = self.store.add_file(part_path, doi=ids["doi"], arxiv_id=ids["arxiv_id"],
+                                           urls=ids["urls"] + [url], title=ids["title"])
+            return {
+                "success": True,
+                "filepath": filepath,
+                "source": "Direct URL",
+                "message": "Download successful"
+            }
+
+        return {
+            "success": False,
+            "filepath": None,
+            "message": f"Transfer interrupted {Config.DOWNLOAD_RESUME_ATTEMPTS + 1} times: {last_error}",
+            "source": "Direct URL",
+            "reason": REASON_INTERRUPTED
+        }
+
+    @staticmethod
+    def _parse_content_range(value: str):
+        """
+        'bytes 100-199/1000' -> (100, 1000); 'bytes */1000' -> (None, 1000)
+        """
+        match = re.match(r'bytes\s+(\d+|\*)(?:-\d+)?/(\d+|\*)', value or '')
+        if not match:
+            return None, None
+        start = int(match.group(1)) if match.group(1) != '*' else None
+        total = int(match.group(2)) if match.group(2) != '*' else None
+        return start, total
+
+    @staticmethod
+    def _discard_part(part_path: str, meta_path: str):
+        for path in (part_path, meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _check_pdf_head(self, head: bytes, f, part_path: str, meta_path: str) -> bytes:
+        """
+        Abort before writing anything if the first bytes are not a PDF header.
+        """
+        if PDF_MAGIC not in head[:SNIFF_BYTES]:
+            f.close()
+            self._discard_part(part_path, meta_path)
+            snippet = head[:SNIFF_BYTES].lstrip()[:15]
+            raise DownloadAborted(REASON_NOT_PDF, f"Response is not a PDF (starts with {snippet!r})")
+        return head
+
+    def _stream_to_part(self, url: str, part_path: str, meta_path: str, retries: int = None):
+        """
+        One transfer attempt. Returns None when the .part file is complete, or a
+        failure result dict for terminal HTTP errors. Raises _RetryTransfer / requests
+        errors for conditions worth resuming, DownloadAborted for ones that are not.
+        retries overrides the HTTP client's own retry count for the request.
+        """
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            validator = None
+            if os.path.exists(meta_path):
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    validator = json.load(f).get("validator")
+            if validator:
+                # Server sends the full body instead of a range if the file changed
+                headers["If-Range"] = validator
+
+        response = self.http.get(url, headers=headers, stream=True, retries=retries,
+                                 timeout=(Config.DOWNLOAD_CONNECT_TIMEOUT, Config.DOWNLOAD_READ_TIMEOUT))
+        try:
+            expected_total = None
+            if response.status_code == 416 and offset:
+                _, total = self._parse_content_range(response.headers.get('Content-Range'))
+                if total == offset:
+                    return None  # Everything was already on disk
+                self._discard_part(part_path, meta_path)
+                raise _RetryTransfer("stale partial file")
+            elif response.status_code == 206 and offset:
+                start, expected_total = self._parse_content_range(response.headers.get('Content-Range'))
+                if start != offset:
+                    self._discard_part(part_path, meta_path)
+                    raise _RetryTransfer("server returned an unexpected range")
+                mode = 'ab'
+            elif response.status_code == 200:
+                # Fresh transfer (or the server ignored Range): start from zero
+                content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+                if content_type and content_type not in PDF_CONTENT_TYPES:
+                    self._discard_part(part_path, meta_path)
+                    raise DownloadAborted(REASON_NOT_PDF, f"Server returned {content_type}, not a PDF")
+                offset = 0
+                mode = 'wb'
+                if response.headers.get('Content-Encoding', 'identity') == 'identity':
+                    length = response.headers.get('Content-Length')
+                    expected_total = int(length) if length and length.isdigit() else None
+                etag = response.headers.get('ETag')
+                validator = etag if etag and not etag.startswith('W/') else response.headers.get('Last-Modified')
+                with open(meta_path, 'w', encoding='utf-8') as f:
+                    json.dump({"url": url, "validator": validator}, f)
             else:
-                 return {
+                return {
                     "success": False,
                     "filepath": None,
                     "message": f"HTTP Error {response.status_code}",
-                    "source": "Direct URL"
+                    "source": "Direct URL",
+                    "reason": REASON_HTTP_ERROR,
+                    "status_code": response.status_code
                 }
-                
-        except Exception as e:
-            return {
-                "success": False,
-                "filepath": None,
-                "message": str(e),
-                "source": "Direct URL"
-            }
+
+            max_bytes = Config.DOWNLOAD_MAX_BYTES
+            if max_bytes and expected_total and expected_total > max_bytes:
+                self._discard_part(part_path, meta_path)
+                raise DownloadAborted(REASON_TOO_LARGE, f"File is {expected_total} bytes (cap {max_bytes})")
+
+            written = offset
+            window_start = time.monotonic()
+            window_bytes = 0
+            # Only a transfer starting at byte 0 can be sniffed; resumed ones were checked before
+            head = b'' if offset == 0 else None
+            with open(part_path, mode) as f:
+                for chunk in response.iter_content(chunk_size=65536):
+                    if not chunk:
+                        continue
+                    if head is not None:
+                        head += chunk
+                        if len(head) < SNIFF_BYTES:
+                            continue
+                        chunk, head = self._check_pdf_head(head, f, part_path, meta_path), None
+                    f.write(chunk)
+                    written += len(chunk)
+                    window_bytes += len(chunk)
+
+                    if max_bytes and written > max_bytes:
+                        f.close()
+                        self._discard_part(part_path, meta_path)
+                        raise DownloadAborted(REASON_TOO_LARGE, f"Exceeded size cap of {max_bytes} bytes")
+
+                    # Throughput check over a sliding window; the .part is kept for a later resume
+                    elapsed = time.monotonic() - window_start
+                    if elapsed >= Config.DOWNLOAD_STALL_WINDOW:
+                        rate = window_bytes / elapsed
+                        if rate < Config.DOWNLOAD_MIN_BYTES_PER_SEC:
+                            raise DownloadAborted(REASON_STALLED, f"Transfer stalled at {rate:.0f} B/s")
+                        window_start = time.monotonic()
+                        window_bytes = 0
+
+                if head is not None:
+                    # Whole body was shorter than SNIFF_BYTES
+                    f.write(self._check_pdf_head(head, f, part_path, meta_path))
+                    written += len(head)
+
+            if expected_total and written < expected_total:
+                raise _RetryTransfer(f"truncated at {written}/{expected_total} bytes")
+            return None
+        finally:
+            response.close()
 
     def download_by_doi(self, doi: str, title: str) -> dict:
         """
         Download using pypaperretriever (more robust for DOIs).
         """
+        cached = self.store.lookup(doi=doi, title=title)
+        if cached:
+            return self._cache_hit(cached)
+
+        known = self.negative_cache.check("doi", doi)
+        if known:
+            return self.negative_cache.skipped_result(known, "DOI-Retriever")
+
+        res = self._download_by_doi(doi, title)
+        # A missing optional dependency is not a property of the DOI, don't cache it
+        if res.get("source") != "DOI-Retriever":
+            self.negative_cache.record("doi", doi, res)
+        return res
+
+    def _download_by_doi(self, doi: str, title: str) -> dict:
+        """
+        Native Unpaywall lookup first, then pypaperretriever (Unpaywall -> SciHub)
+        with a direct SciHub fallback.
+        """
+        pdf_url = self.unpaywall.resolve_pdf_url(doi)
+        if pdf_url:
+            print(f"Unpaywall OA location for {doi}: {pdf_url}")
+            res = self.download_from_url(pdf_url, title, paper={"Title": title, "DOI": doi})
+            if res['success']:
+                if not res.get('cached'):
+                    res['source'] = "Unpaywall"
+                return res
+
         print(f"Downloading via DOI (pypaperretriever): {doi}")
         try:
             from pypaperretriever import PaperRetriever
@@ -87,8 +382,10 @@ class DownloaderService:
             # Try PyPaperRetriever first (Priority: Unpaywall -> SciHub)
             try:
                 # Using user's email for Unpaywall API (requires valid email)
+                if not Config.UNPAYWALL_EMAIL:
+                    raise Exception("UNPAYWALL_EMAIL is not set")
                 retriever = PaperRetriever(
-                    email="superjorgy007@hotmail.com", 
+                    email=Config.UNPAYWALL_EMAIL, 
                     doi=clean_doi,
                     download_directory=self.download_dir,
                     allow_scihub=True
@@ -98,9 +395,12 @@ class DownloaderService:
                 
                 # Check result properties
                 if result and hasattr(result, 'is_downloaded') and result.is_downloaded:
+                    saved = getattr(result, 'saved_file_path', None)
+                    if saved and os.path.isfile(saved):
+                        saved = self.store.add_file(saved, doi=clean_doi, title=title)
                     return {
                         "success": True,
-                        "filepath": getattr(result, 'saved_file_path', self.download_dir),
+                        "filepath": saved or self.download_dir,
                         "source": "Unpaywall/SciHub",
                         "message": "Download successful via DOI"
                     }
@@ -112,9 +412,7 @@ class DownloaderService:
                 
                 # Fallback to direct SciHub
                 sh = SciHub()
-                # Check if we should sanitize title for filename
-                output_name = re.sub(r'[^\w\s-]', '', title).strip() + ".pdf" if title else f"{clean_doi.replace('/', '_')}.pdf"
-                output_path = os.path.join(self.download_dir, output_name)
+                output_path = self._temp_path(f"doi:{clean_doi}")
                 
                 try:
                     # scihub download returns a dictionary or bytes?
@@ -122,9 +420,10 @@ class DownloaderService:
                     sh_result = sh.download(clean_doi, path=output_path)
                     
                     if os.path.exists(output_path):
+                         stored = self.store.add_file(output_path, doi=clean_doi, title=title)
                          return {
                             "success": True,
-                            "filepath": output_path,
+                            "filepath": stored,
                             "source": "Direct SciHub",
                             "message": "Download successful via Direct SciHub"
                         }
@@ -133,14 +432,16 @@ class DownloaderService:
                             "success": False,
                             "filepath": None,
                             "message": "Direct SciHub failed to save file",
-                            "source": "Direct SciHub"
+                            "source": "Direct SciHub",
+                            "reason": REASON_NOT_FOUND
                         }
                 except Exception as sh_e:
                      return {
                         "success": False,
                         "filepath": None,
                         "message": f"All DOI methods failed. PyPaperRetriever: {e}, SciHub: {sh_e}",
-                        "source": "DOI-Fallback-Failed"
+                        "source": "DOI-Fallback-Failed",
+                        "reason": REASON_NOT_FOUND
                     }
         except Exception as e:
             return {
@@ -149,16 +450,132 @@ class DownloaderService:
                 "message": f"Unexpected error: {str(e)}",
                 "source": "Process-Error"
             }
-            
 
+    def default_strategies(self) -> list:
         """
-        [DEPRECATED] Download by title using PyPaperBot was unreliable.
-        Now mostly a placeholder or legacy method.
+        Strategies available without external services: direct link, then DOI.
+        Each entry is (name, callable(paper) -> result dict or None if not applicable).
         """
-        print(f"Skipping download_paper (PyPaperBot) for: {title} - Method Disabled by configuration.")
-        return {
+        return [
+            ("direct", self._try_direct_link),
+            ("doi", self._try_doi),
+        ]
+
+    def _try_direct_link(self, paper: dict):
+        url = paper.get('PDF_Link')
+        if not url:
+            # Search results like ArXiv's carry the PDF itself as URL
+            landing = str(paper.get('URL') or '')
+            if landing.lower().endswith('.pdf') or '/pdf/' in landing:
+                url = landing
+        if not url:
+            return None
+        return self.download_from_url(url, paper.get('Title', 'Unknown'), paper=paper)
+
+    def _try_doi(self, paper: dict):
+        doi = str(paper.get('DOI') or 'N/A').strip()
+        if doi.lower() in ('n/a', 'nan', '') or doi.startswith('ArXiv:'):
+            return None
+        return self.download_by_doi(doi, paper.get('Title', 'Unknown'))
+
+    def download_paper(self, paper, strategies: list = None, adaptive: bool = True) -> dict:
+        """
+        Download a single paper by trying each strategy in order until one succeeds.
+        Accepts a search-result dict (Title, DOI, PDF_Link, URL...) or a bare title.
+        With adaptive=True the order comes from StrategyStats for the paper's domain/source.
+        """
+        if isinstance(paper, str):
+            paper = {"Title": paper}
+
+        cached = self.find_cached(paper)
+        if cached:
+            return cached
+
+        strategies = strategies or self.default_strategies()
+        if adaptive:
+            strategies = self.strategy_stats.order(paper, strategies)
+
+        last = None
+        for name, strategy in strategies:
+            started = time.monotonic()
+            res = strategy(paper)
+            if res is None:
+                continue
+            res.setdefault("strategy", name)
+            if not res.get("cached") and res.get("reason") not in (REASON_KNOWN_FAILURE, REASON_CHALLENGE):
+                self.strategy_stats.record(paper, name, res.get("success", False), time.monotonic() - started)
+            if res.get("success"):
+                return res
+            last = res
+
+            if res.get("reason") == REASON_NOT_PDF and name == "direct" and not str(paper.get('URL') or '').startswith('http'):
+                # The "PDF" link is really an HTML landing page: let the crawl strategies visit it
+                paper = dict(paper, URL=paper.get('PDF_Link'))
+
+        return last or {
             "success": False,
             "filepath": None,
-            "message": "PyPaperBot downloaded disabled.",
-            "source": "Disabled"
+            "message": "No download strategy applicable (no PDF link or DOI)",
+            "source": "None"
         }
+
+    def download_many(self, papers, download_fn=None, max_workers: int = None,
+                      progress_callback=None) -> list:
+        """
+        Download a batch of papers concurrently.
+
+        Args:
+            papers: Iterable of paper dicts (or titles). Consumed lazily, so a generator
+                    lets downloads start while the search is still producing results.
+            download_fn: Callable(paper) -> result dict. Defaults to download_paper.
+            max_workers: Global concurrency cap (default Config.DOWNLOAD_WORKERS).
+                         Per-host concurrency is capped by self.host_limiter.
+            progress_callback: Called as callback(done, total, paper, result) from the
+                               calling thread after each paper finishes. total is None
+                               when papers has no length.
+
+        Returns:
+            List of result dicts in the same order as the input.
+        """
+        download_fn = download_fn or self.download_paper
+        max_workers = max_workers or Config.DOWNLOAD_WORKERS
+        total = len(papers) if hasattr(papers, '__len__') else None
+
+        def _run(paper):
+            try:
+                return download_fn(paper)
+            except Exception as e:
+                return {
+                    "success": False,
+                    "filepath": None,
+                    "message": f"Unexpected error: {str(e)}",
+                    "source": "Process-Error"
+                }
+
+        results = []
+        pending = {}
+        done = 0
+
+        def _collect(block: bool):
+            nonlocal done
+            if not pending:
+                return
+            finished, _ = wait(pending, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+            for future in finished:
+                i, paper = pending.pop(future)
+                results[i] = future.result()
+                done += 1
+                if progress_callback:
+                    progress_callback(done, total, paper, results[i])
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for i, paper in enumerate(papers):
+                results.append(None)
+                pending[executor.submit(_run, paper)] = (i, paper)
+                # Report anything already finished while the input is still being produced
+                _collect(block=False)
+
+            while pending:
+                _collect(block=True)
+
+        return results
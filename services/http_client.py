@@ -0,0 +1,188 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter, BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from config import Config
+
+try:
+    import httpx
+    import h2  # noqa: F401  (httpx needs it for http2=True)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class _HttpxRaw:
+    """
+    Minimal file-like wrapper so requests.Response can stream an httpx response.
+    """
+
+    def __init__(self, response):
+        self._response = response
+        self._iter = None
+
+    def stream(self, chunk_size=8192, decode_content=True):
+        yield from self._response.iter_bytes(chunk_size)
+
+    def read(self, amt=None, decode_content=True):
+        if self._iter is None:
+            self._iter = self._response.iter_bytes(amt or 65536)
+        try:
+            return next(self._iter)
+        except StopIteration:
+            return b''
+
+    def close(self):
+        self._response.close()
+
+    def release_conn(self):
+        self._response.close()
+
+
+class _Http2Adapter(BaseAdapter):
+    """
+    requests transport adapter backed by an httpx HTTP/2 client.
+    Lets the rest of the code keep using requests' API while multiplexing
+    requests to the same host over a single connection.
+    """
+
+    def __init__(self, pool_maxsize: int):
+        super().__init__()
+        self._client = httpx.Client(
+            http2=True,
+            follow_redirects=False,
+            limits=httpx.Limits(max_keepalive_connections=pool_maxsize)
+        )
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        req = self._client.build_request(request.method, request.url, headers=dict(request.headers),
+                                         content=request.body, timeout=timeout)
+        try:
+            resp = self._client.send(req, stream=True)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(e, request=request)
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(e, request=request)
+
+        response = requests.Response()
+        response.status_code = resp.status_code
+        response.headers = CaseInsensitiveDict(resp.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = _HttpxRaw(resp)
+        response.reason = resp.reason_phrase
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        if not stream:
+            response.content
+        return response
+
+    def close(self):
+        self._client.close()
+
+
+class HttpClient:
+    """
+    Shared HTTP layer for all services.
+
+    - One requests.Session with per-host connection pools (keep-alive, no repeated TLS handshakes).
+    - Retries with exponential backoff for connection errors and retryable status codes,
+      honouring Retry-After.
+    - Optional HTTP/2 for https:// when httpx[http2] is installed and Config.HTTP2_ENABLED is set.
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, max_retries: int = None, backoff_factor: float = None, max_backoff: float = None,
+                 pool_maxsize: int = None, http2: bool = None):
+        self.max_retries = Config.HTTP_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_factor = Config.HTTP_BACKOFF_FACTOR if backoff_factor is None else backoff_factor
+        self.max_backoff = Config.HTTP_MAX_BACKOFF if max_backoff is None else max_backoff
+        pool_maxsize = pool_maxsize or Config.HTTP_POOL_MAXSIZE
+        http2 = Config.HTTP2_ENABLED if http2 is None else http2
+
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": Config.USER_AGENT})
+
+        # pool_connections = number of hosts kept warm, pool_maxsize = connections per host
+        adapter = HTTPAdapter(pool_connections=Config.HTTP_POOL_HOSTS, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        if http2:
+            if HTTP2_AVAILABLE:
+                self.session.mount("https://", _Http2Adapter(pool_maxsize))
+            else:
+                print("⚠️ HTTP/2 requested but httpx[http2] is not installed. Using HTTP/1.1.")
+
+    def _retry_delay(self, attempt: int, response=None) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    delay = float(retry_after)
+                except ValueError:
+                    try:
+                        delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                    except Exception:
+                        delay = None
+                if delay is not None:
+                    return min(max(delay, 0), self.max_backoff)
+        # Exponential backoff with jitter so parallel workers don't retry in lockstep
+        delay = self.backoff_factor * (2 ** attempt)
+        return min(delay + random.uniform(0, self.backoff_factor), self.max_backoff)
+
+    def request(self, method: str, url: str, retries: int = None, **kwargs) -> requests.Response:
+        """
+        Same signature as requests.request, plus an optional per-call retry override.
+        """
+        retries = self.max_retries if retries is None else retries
+        kwargs.setdefault("timeout", 30)
+
+        attempt = 0
+        while True:
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt >= retries:
+                    raise
+                delay = self._retry_delay(attempt)
+                print(f"   ↻ {type(e).__name__} for {url}. Retrying in {delay:.1f}s ({attempt + 1}/{retries})")
+            else:
+                if response.status_code not in self.RETRY_STATUSES or attempt >= retries:
+                    return response
+                delay = self._retry_delay(attempt, response)
+                print(f"   ↻ HTTP {response.status_code} for {url}. Retrying in {delay:.1f}s ({attempt + 1}/{retries})")
+                response.close()
+
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """
+    Process-wide shared client, created on first use.
+    """
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
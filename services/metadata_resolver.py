@@ -0,0 +1,131 @@
+import difflib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Config
+from services.http_client import get_http_client
+from services.pdf_store import normalize_title, normalize_doi
+from utils.concurrency import RateLimiter
+from utils.json_store import TTLCache
+
+
+class MetadataResolver:
+    """
+    Title -> DOI resolution through the CrossRef works API.
+
+    - Candidates are scored by fuzzy title similarity (difflib) and only accepted
+      above METADATA_MIN_SCORE, so a loosely related top hit is not taken as the paper.
+    - Bulk lookups run concurrently under a shared requests-per-second limit.
+    - Answers (including "no match") are kept in a persistent cache keyed by normalized title.
+    """
+
+    API_URL = "https://api.crossref.org/works"
+
+    def __init__(self, http_client=None, cache: TTLCache = None, rate: float = None,
+                 max_workers: int = None, min_score: float = None):
+        self.http = http_client or get_http_client()
+        self.cache = cache or TTLCache(os.path.join(Config.CACHE_DIR, "metadata.json"),
+                                       Config.METADATA_CACHE_TTL)
+        self.rate_limiter = RateLimiter(rate or Config.METADATA_RATE, burst=2)
+        self.max_workers = max_workers or Config.METADATA_WORKERS
+        self.min_score = Config.METADATA_MIN_SCORE if min_score is None else min_score
+
+    @staticmethod
+    def score(a: str, b: str) -> float:
+        """
+        Similarity of two titles in [0, 1] after normalization.
+        """
+        a, b = normalize_title(a), normalize_title(b)
+        if not a or not b:
+            return 0.0
+        return difflib.SequenceMatcher(None, a, b).ratio()
+
+    @staticmethod
+    def has_doi(paper: dict) -> bool:
+        return bool(normalize_doi(str(paper.get('DOI') or '')))
+
+    def _query(self, title: str):
+        """
+        One CrossRef request. Returns the best match dict, None for "no good match",
+        or raises on network/HTTP trouble (which is not cached).
+        """
+        params = {
+            "query.bibliographic": title,
+            "rows": 5,
+            "select": "DOI,title,issued"
+        }
+        if Config.UNPAYWALL_EMAIL:
+            # Polite pool: identify ourselves with the contact address
+            params["mailto"] = Config.UNPAYWALL_EMAIL
+        with self.rate_limiter:
+            response = self.http.get(self.API_URL, params=params, timeout=10)
+        response.raise_for_status()
+
+        best = None
+        for item in response.json().get("message", {}).get("items", []):
+            candidate = (item.get("title") or [""])[0]
+            score = self.score(title, candidate)
+            if best is None or score > best["score"]:
+                year = ((item.get("issued") or {}).get("date-parts") or [[None]])[0][0]
+                best = {"doi": item.get("DOI"), "title": candidate, "score": round(score, 3), "year": year}
+        if best and best["doi"] and best["score"] >= self.min_score:
+            return best
+        return None
+
+    def resolve(self, title: str):
+        """
+        Return {"doi", "title", "score", "year"} for the best CrossRef match, or None.
+        """
+        key = normalize_title(title)
+        if not key:
+            return None
+        entry = self.cache.get_entry(key)
+        if entry is not None:
+            return entry["value"]
+        try:
+            match = self._query(title)
+        except Exception as e:
+            print(f"CrossRef Error for '{title[:40]}': {e}")
+            return None
+        self.cache.set(key, match, ttl=None if match else Config.METADATA_MISS_TTL)
+        return match
+
+    def resolve_many(self, titles: list) -> dict:
+        """
+        Resolve many titles concurrently. Returns {title: match or None}.
+        Cached titles are answered without touching the network.
+        """
+        unique = list(dict.fromkeys(t for t in titles if normalize_title(t)))
+        results = {}
+        todo = []
+        for title in unique:
+            entry = self.cache.get_entry(normalize_title(title))
+            if entry is not None:
+                results[title] = entry["value"]
+            else:
+                todo.append(title)
+
+        if todo:
+            print(f"🔎 Resolving {len(todo)} titles via CrossRef ({len(unique) - len(todo)} cached)...")
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for title, match in zip(todo, executor.map(self.resolve, todo)):
+                    results[title] = match
+        return results
+
+    def fill_dois(self, papers: list) -> int:
+        """
+        Set 'DOI' on papers that have none, in place. Returns how many were filled.
+        """
+        missing = [p for p in papers if not self.has_doi(p)
+                   and str(p.get('Title') or '') not in ('', 'N/A', 'Unknown')]
+        if not missing:
+            return 0
+        matches = self.resolve_many([p['Title'] for p in missing])
+        filled = 0
+        for paper in missing:
+            match = matches.get(paper['Title'])
+            if match:
+                paper['DOI'] = match['doi']
+                filled += 1
+        print(f"   DOI found for {filled}/{len(missing)} titles")
+        return filled
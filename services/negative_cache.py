@@ -0,0 +1,70 @@
+import os
+import time
+
+from config import Config
+from utils.json_store import TTLCache
+
+REASON_KNOWN_FAILURE = "known_failure"
+
+# Failures that may well succeed on the next run get a much shorter TTL
+TRANSIENT_REASONS = ("stalled", "interrupted", "error")
+
+
+class NegativeCache:
+    """
+    Persistent record of download strategies that already failed for a DOI/URL.
+
+    Keyed by "<strategy>|<target>" and storing the failure reason and message, so a
+    re-run of the same sheet skips known-dead strategies until their TTL expires.
+    """
+
+    def __init__(self, path: str = None, ttl: float = None, transient_ttl: float = None):
+        self.cache = TTLCache(
+            path or os.path.join(Config.CACHE_DIR, "negative_cache.json"),
+            Config.NEGATIVE_CACHE_TTL if ttl is None else ttl
+        )
+        self.transient_ttl = Config.NEGATIVE_CACHE_TRANSIENT_TTL if transient_ttl is None else transient_ttl
+
+    @staticmethod
+    def _key(strategy: str, target: str) -> str:
+        target = str(target).strip()
+        # DOIs are case-insensitive, URLs are not
+        return f"{strategy}|{target.lower() if strategy == 'doi' else target}"
+
+    def check(self, strategy: str, target: str):
+        """
+        Return the cached failure record ({"reason", "message", "failed_at"}) or None.
+        """
+        if not target:
+            return None
+        return self.cache.get(self._key(strategy, target))
+
+    def record(self, strategy: str, target: str, result: dict):
+        """
+        Remember a failed result. Server-side errors and interrupted transfers are
+        considered transient and expire after NEGATIVE_CACHE_TRANSIENT_TTL.
+        """
+        if not target or result.get("success"):
+            return
+        reason = result.get("reason") or "error"
+        status = result.get("status_code")
+        transient = reason in TRANSIENT_REASONS or (status is not None and (status >= 500 or status == 429))
+        self.cache.set(self._key(strategy, target), {
+            "reason": reason,
+            "message": result.get("message", ""),
+            "failed_at": time.time()
+        }, ttl=self.transient_ttl if transient else None)
+
+    @staticmethod
+    def skipped_result(entry: dict, source: str) -> dict:
+        """
+        Result dict returned instead of re-running a strategy that is known to fail.
+        """
+        hours = (time.time() - entry.get("failed_at", time.time())) / 3600
+        return {
+            "success": False,
+            "filepath": None,
+            "message": f"Skipped: failed {hours:.1f}h ago ({entry.get('message') or entry.get('reason')})",
+            "source": source,
+            "reason": REASON_KNOWN_FAILURE
+        }
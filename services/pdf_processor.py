@@ -1,16 +1,24 @@
 
 import fitz  # PyMuPDF
 import os
+import re
+import xml.etree.ElementTree as ET
 
 class PDFProcessor:
+    # Full-text XML has no pages: max_pages is applied as roughly this many characters per page
+    XML_CHARS_PER_PAGE = 3000
+
     @staticmethod
     def extract_text(pdf_path: str, max_pages: int = None) -> tuple:
         """
-        Extract text from a PDF file. 
+        Extract text from a PDF file (or a PMC JATS full-text .xml file).
         Returns: (text, error_message)
         """
         if not os.path.exists(pdf_path):
             return None, "File not found"
+
+        if pdf_path.lower().endswith('.xml'):
+            return PDFProcessor.extract_xml_text(pdf_path, max_pages=max_pages)
             
         try:
             doc = fitz.open(pdf_path)
@@ -33,6 +41,53 @@ class PDFProcessor:
             print(f"Error reading PDF {pdf_path}: {e}")
             return None, str(e)
 
+    @staticmethod
+    def extract_xml_text(xml_path: str, max_pages: int = None) -> tuple:
+        """
+        Extract title, abstract and body text from a JATS article (PMC efetch XML).
+        Section titles and paragraphs become lines; the reference list is skipped.
+        Returns: (text, error_message)
+        """
+        try:
+            root = ET.parse(xml_path).getroot()
+        except Exception as e:
+            print(f"Error reading XML {xml_path}: {e}")
+            return None, str(e)
+
+        article = root if root.tag == 'article' else root.find('.//article')
+        if article is None:
+            return None, "XML contains no JATS <article>"
+
+        def _text(elem):
+            return re.sub(r'\s+', ' ', ''.join(elem.itertext())).strip()
+
+        lines = []
+        title = article.find('.//front//article-title')
+        if title is not None:
+            lines.append(_text(title))
+
+        def _walk(elem):
+            # A paragraph is emitted whole (lists nested in it included), never descended into
+            for child in elem:
+                if child.tag in ('title', 'p'):
+                    line = _text(child)
+                    if line:
+                        lines.append(line)
+                elif child.tag != 'ref-list':
+                    _walk(child)
+
+        body = article.find('body')
+        for part in (article.find('.//front//abstract'), body):
+            if part is not None:
+                _walk(part)
+
+        full_text = "\n".join(lines)
+        if max_pages:
+            full_text = full_text[:max_pages * PDFProcessor.XML_CHARS_PER_PAGE]
+        if body is None or not full_text.strip():
+            return None, "XML contains no full-text body"
+        return full_text, None
+
     @staticmethod
     def get_token_count_estimate(text: str) -> int:
         """
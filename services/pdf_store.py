@@ -0,0 +1,169 @@
+import hashlib
+import os
+import re
+import shutil
+import threading
+
+from utils.json_store import JsonStore
+
+
+def normalize_title(title: str) -> str:
+    """
+    Lowercase, drop punctuation and collapse whitespace so that
+    'Deep Learning: A Review.' and 'deep learning a review' share a key.
+    """
+    if not title:
+        return ""
+    title = re.sub(r'[^\w\s]', ' ', str(title).lower())
+    return re.sub(r'\s+', ' ', title).strip()
+
+
+def normalize_doi(doi: str) -> str:
+    if not doi:
+        return ""
+    doi = str(doi).strip().lower()
+    doi = re.sub(r'^(https?://(dx\.)?doi\.org/|doi:\s*)', '', doi)
+    if doi in ('n/a', 'nan') or not doi.startswith('10.'):
+        return ""
+    return doi
+
+
+def normalize_arxiv_id(arxiv_id: str) -> str:
+    """
+    '2101.00001v2' -> '2101.00001', 'ArXiv:hep-th/0001001v1' -> 'hep-th/0001001'
+    """
+    if not arxiv_id:
+        return ""
+    arxiv_id = re.sub(r'^arxiv:', '', str(arxiv_id).strip(), flags=re.IGNORECASE)
+    return re.sub(r'v\d+$', '', arxiv_id).lower()
+
+
+def ids_from_paper(paper: dict) -> dict:
+    """
+    Collect every identifier a search result carries, in PDFStore.keys_for() form.
+    """
+    doi = str(paper.get('DOI') or '')
+    arxiv_id = paper.get('ArXiv_ID')
+    if not arxiv_id and doi.lower().startswith('arxiv:'):
+        arxiv_id = doi
+    urls = [u for u in (paper.get('PDF_Link'), paper.get('URL')) if u and str(u).startswith('http')]
+    return {
+        "doi": doi,
+        "arxiv_id": arxiv_id,
+        "urls": urls,
+        "title": paper.get('Title'),
+    }
+
+
+class PDFStore:
+    """
+    Content-addressed PDF store.
+
+    Every file is identified by the SHA-256 of its bytes, so the same paper fetched
+    through ArXiv, Scholar and DOI paths is kept once. A persistent index maps DOI,
+    arXiv ID, URL and normalized title to the blob, which lets every download path
+    answer from disk before touching the network.
+    """
+
+    def __init__(self, root_dir: str, index_path: str = None):
+        self.root_dir = root_dir
+        os.makedirs(self.root_dir, exist_ok=True)
+        self.index = JsonStore(index_path or os.path.join(root_dir, ".pdf_index.json"))
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def keys_for(doi: str = None, arxiv_id: str = None, urls: list = None, title: str = None) -> list:
+        keys = []
+        if normalize_doi(doi):
+            keys.append(f"doi:{normalize_doi(doi)}")
+        if normalize_arxiv_id(arxiv_id):
+            keys.append(f"arxiv:{normalize_arxiv_id(arxiv_id)}")
+        for url in urls or []:
+            keys.append(f"url:{str(url).strip()}")
+        if normalize_title(title):
+            keys.append(f"title:{normalize_title(title)}")
+        return keys
+
+    @staticmethod
+    def sha256_file(path: str) -> str:
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _blob_name(self, digest: str, title: str = None, ext: str = ".pdf") -> str:
+        # Human-readable prefix for the analysis tab, hash suffix for uniqueness
+        slug = re.sub(r'[^\w\s-]', '', title or '').strip()[:80]
+        slug = re.sub(r'\s+', ' ', slug)
+        return f"{slug} [{digest[:12]}]{ext}" if slug else f"{digest}{ext}"
+
+    def lookup(self, doi: str = None, arxiv_id: str = None, urls: list = None, title: str = None) -> str:
+        """
+        Return the stored file path for any of the given identifiers, or None.
+        A title match is rejected when the stored file carries a different DOI or arXiv
+        ID than the one asked for ("Editorial", "Correction"... are not unique titles).
+        """
+        for key in self.keys_for(doi, arxiv_id, urls, title):
+            digest = self.index.get(key)
+            if not digest:
+                continue
+            blob = self.index.get(f"blob:{digest}")
+            if blob and os.path.exists(blob["path"]):
+                if key.startswith("title:") and self._conflicts(blob, doi, arxiv_id):
+                    continue
+                return blob["path"]
+            # File was removed by the user: forget the stale entry
+            self.index.delete(key)
+        return None
+
+    @staticmethod
+    def _conflicts(blob: dict, doi: str = None, arxiv_id: str = None) -> bool:
+        doi, arxiv_id = normalize_doi(doi), normalize_arxiv_id(arxiv_id)
+        if doi and blob.get("dois") and doi not in blob["dois"]:
+            return True
+        return bool(arxiv_id and blob.get("arxiv_ids") and arxiv_id not in blob["arxiv_ids"])
+
+    def lookup_paper(self, paper: dict) -> str:
+        return self.lookup(**ids_from_paper(paper))
+
+    def add_file(self, src_path: str, doi: str = None, arxiv_id: str = None, urls: list = None,
+                 title: str = None) -> str:
+        """
+        Move a downloaded file into the store and index it under the given identifiers.
+        If identical bytes are already stored, the new copy is discarded.
+        Returns the path of the stored blob.
+        """
+        digest = self.sha256_file(src_path)
+        with self._lock:
+            blob = self.index.get(f"blob:{digest}")
+            if blob and os.path.exists(blob["path"]):
+                if os.path.abspath(src_path) != os.path.abspath(blob["path"]):
+                    os.remove(src_path)
+                path = blob["path"]
+            else:
+                # Full-text XML (PMC JATS) keeps its extension; anything else is a PDF (.part/.tmp sources)
+                ext = ".xml" if src_path.lower().endswith(".xml") else ".pdf"
+                path = os.path.join(self.root_dir, self._blob_name(digest, title, ext))
+                if os.path.abspath(src_path) != os.path.abspath(path):
+                    shutil.move(src_path, path)
+                blob = {"path": path, "size": os.path.getsize(path), "title": title or ""}
+
+            # Identifiers the bytes are known under, to vet later title-only matches
+            blob = dict(blob)
+            for field, value in (("dois", normalize_doi(doi)), ("arxiv_ids", normalize_arxiv_id(arxiv_id))):
+                known = list(blob.get(field) or [])
+                if value and value not in known:
+                    known.append(value)
+                if known:
+                    blob[field] = known
+            entries = {f"blob:{digest}": blob}
+            for key in self.keys_for(doi, arxiv_id, urls, title):
+                entries[key] = digest
+            self.index.update(entries)
+        return path
+
+    def add_paper_file(self, src_path: str, paper: dict, urls: list = None) -> str:
+        ids = ids_from_paper(paper)
+        ids["urls"] = ids["urls"] + list(urls or [])
+        return self.add_file(src_path, **ids)
@@ -1,72 +1,257 @@
 
 from Bio import Entrez
-import time
+import os
+import re
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Config
+from services.http_client import get_http_client
+from services.search_cache import SearchCache, get_search_cache
+from utils.concurrency import RateLimiter
+from utils.json_store import TTLCache
+
+# NCBI allows 3 requests/second per client, 10 with an API key; Bio.Entrez's own
+# spacing is not thread-safe, so concurrent batches go through this shared limiter
+_ncbi_rate_limiter = RateLimiter(Config.NCBI_RATE)
 
 class PubMedService:
-    def __init__(self, email: str = "your.email@example.com"):
+    # PMC open-access web service: PMCID -> OA package / PDF locations
+    PMC_OA_URL = "https://www.ncbi.nlm.nih.gov/pmc/utils/oa/oa.fcgi"
+
+    def __init__(self, email: str = None, search_cache: SearchCache = None, api_key: str = None,
+                 http_client=None, pmc_cache: TTLCache = None):
         # Always tell NCBI who you are
-        Entrez.email = email
+        Entrez.email = email or Config.NCBI_EMAIL or None
+        Entrez.api_key = api_key or Config.NCBI_API_KEY or None
+        self.search_cache = search_cache or get_search_cache()
+        self.http = http_client or get_http_client()
+        self.pmc_cache = pmc_cache or TTLCache(os.path.join(Config.CACHE_DIR, "pmc_oa.json"),
+                                               Config.PMC_OA_CACHE_TTL)
 
-    def search_papers(self, query: str, limit: int = 10) -> list:
+    def search_papers(self, query: str, limit: int = 10, force_refresh: bool = False) -> list:
         """
         Search for papers in PubMed.
-        Returns list of dicts with Title, DOI, Publication_Year, Source.
+        Returns list of dicts with Title, DOI, Publication_Year, Source, Abstract.
+        Results are cached per query/limit; force_refresh queries NCBI again.
+        """
+        return list(self.iter_papers(query, limit=limit, force_refresh=force_refresh))
+
+    def iter_papers(self, query: str, limit: int = 10, force_refresh: bool = False):
+        """
+        Stream search results batch by batch.
+
+        esearch stores the hits on NCBI's history server (usehistory), then summaries
+        are fetched in PUBMED_BATCH_SIZE slices by WebEnv/query_key, never by a long ID
+        list in the URL. Batches run concurrently within the NCBI rate limit and are
+        yielded in rank order. Complete searches are cached per query/limit.
         """
+        if not force_refresh:
+            cached = self.search_cache.get("pubmed", query, limit)
+            if cached is not None:
+                print(f"⚡ Using cached pubmed results for: {query} ({len(cached)} papers)")
+                yield from cached
+                return
+
         print(f"Searching PubMed for: {query}")
         try:
-            # 1. Search for IDs
-            handle = Entrez.esearch(db="pubmed", term=query, retmax=limit)
-            record = Entrez.read(handle)
-            handle.close()
-            
-            id_list = record["IdList"]
-            if not id_list:
-                return []
-                
-            # 2. Fetch details
-            handle = Entrez.efetch(db="pubmed", id=id_list, rettype="medline", retmode="text")
-            # We parse simplified xml or medline format
-            # Let's use ESummary for easier JSON-like parsing usually, but EFetch gives more data.
-            # Using ESummary for simplicity:
-            handle = Entrez.esummary(db="pubmed", id=",".join(id_list), retmode="xml")
-            records = Entrez.read(handle)
-            handle.close()
-            
-            results = []
-            for r in records:
+            with _ncbi_rate_limiter:
+                handle = Entrez.esearch(db="pubmed", term=query, retmax=0, usehistory="y")
+            try:
+                record = Entrez.read(handle)
+            finally:
+                handle.close()
+        except Exception as e:
+            print(f"PubMed Search Error: {e}")
+            print("Make sure 'biopython' is installed: pip install biopython")
+            return
+
+        total = min(int(record.get("Count", 0)), int(limit))
+        if not total:
+            return
+        history = {"webenv": record["WebEnv"], "query_key": record["QueryKey"]}
+
+        batch_size = max(1, Config.PUBMED_BATCH_SIZE)
+        starts = range(0, total, batch_size)
+        collected = []
+        complete = True
+        executor = ThreadPoolExecutor(max_workers=max(1, Config.PUBMED_WORKERS))
+        try:
+            futures = [executor.submit(self._fetch_batch, history, start, min(batch_size, total - start))
+                       for start in starts]
+            for start, future in zip(starts, futures):
                 try:
-                    title = r.get("Title", "N/A")
-                    pub_date = r.get("PubDate", "")
-                    # Extract year roughly
-                    year = pub_date.split()[0] if pub_date else "N/A"
-                    
-                    # DOI is often in ArticleIds
-                    doi = "N/A"
-                    if "ArticleIds" in r:
-                        # ArticleIds is a dictionary-like object/list in BioPython
-                        # It usually looks like {'pubmed': ['123'], 'doi': '10.xxx', ...}
-                        # or a list of strings
-                        
-                        # In Entrez esummary XML, ArticleIds is a dictionary where keys are types
-                        if 'doi' in r['ArticleIds']:
-                            doi = r['ArticleIds']['doi']
-                    
-                    source = r.get("Source", "PubMed")
-                    
-                    results.append({
-                        "Title": title,
-                        "DOI": doi,
-                        "Publication_Year": year,
-                        "Source": f"PubMed ({source})",
-                        "Authors": ", ".join(r.get("AuthorList", [])) if "AuthorList" in r else "N/A"
-                    })
+                    records, abstracts = future.result()
                 except Exception as e:
-                    print(f"Error parsing PubMed record: {e}")
+                    print(f"PubMed Summary Error (results {start}-{start + batch_size}): {e}")
+                    complete = False
                     continue
-                    
-            return results
-            
+                for r in records:
+                    paper = self._parse_summary(r)
+                    if paper:
+                        paper["Abstract"] = abstracts.get(paper["PMID"], "")
+                        collected.append(dict(paper))
+                        yield paper
+        finally:
+            # A consumer that stops early should not wait for the remaining batches
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if complete:
+            self.search_cache.set("pubmed", query, limit, collected)
+
+    @classmethod
+    def _fetch_batch(cls, history: dict, start: int, count: int) -> tuple:
+        """
+        Summaries and abstracts for results [start, start + count) of a history-server search.
+        Returns (esummary DocSums, {pmid: abstract}); a failed abstract call only loses abstracts.
+        """
+        with _ncbi_rate_limiter:
+            handle = Entrez.esummary(db="pubmed", webenv=history["webenv"], query_key=history["query_key"],
+                                     retstart=start, retmax=count, retmode="xml")
+        try:
+            records = Entrez.read(handle)
+        finally:
+            handle.close()
+
+        abstracts = {}
+        if Config.PUBMED_FETCH_ABSTRACTS:
+            try:
+                abstracts = cls._fetch_abstracts(history, start, count)
+            except Exception as e:
+                print(f"PubMed Abstract Error (results {start}-{start + count}): {e}")
+        return records, abstracts
+
+    @staticmethod
+    def _fetch_abstracts(history: dict, start: int, count: int) -> dict:
+        """
+        One efetch (PubMed XML) call for the same slice -> {pmid: abstract text}.
+        Structured abstracts keep their section labels ("METHODS: ...").
+        """
+        with _ncbi_rate_limiter:
+            handle = Entrez.efetch(db="pubmed", webenv=history["webenv"], query_key=history["query_key"],
+                                   retstart=start, retmax=count, rettype="abstract", retmode="xml")
+        try:
+            data = Entrez.read(handle)
+        finally:
+            handle.close()
+
+        abstracts = {}
+        for article in data.get("PubmedArticle", []):
+            citation = article.get("MedlineCitation", {})
+            parts = []
+            for section in citation.get("Article", {}).get("Abstract", {}).get("AbstractText", []):
+                label = getattr(section, "attributes", {}).get("Label")
+                parts.append(f"{label}: {section}" if label else str(section))
+            if parts:
+                abstracts[str(citation.get("PMID", ""))] = " ".join(parts)
+        return abstracts
+
+    @staticmethod
+    def _parse_summary(r) -> dict:
+        """
+        ESummary DocSum -> search result dict (None if it cannot be parsed).
+        """
+        try:
+            title = r.get("Title", "N/A")
+            pub_date = r.get("PubDate", "")
+            # Extract year roughly
+            year = pub_date.split()[0] if pub_date else "N/A"
+
+            # DOI and PMCID are often in ArticleIds
+            doi = "N/A"
+            pmcid = ""
+            if "ArticleIds" in r:
+                # In Entrez esummary XML, ArticleIds is a dictionary where keys are types
+                # It usually looks like {'pubmed': ['123'], 'doi': '10.xxx', 'pmc': 'PMC456', ...}
+                if 'doi' in r['ArticleIds']:
+                    doi = r['ArticleIds']['doi']
+                pmcid = PubMedService.normalize_pmcid(r['ArticleIds'].get('pmc', ''))
+
+            source = r.get("Source", "PubMed")
+
+            paper = {
+                "Title": title,
+                "DOI": doi,
+                "PMID": str(r.get("Id", "")),
+                "Publication_Year": year,
+                "Source": f"PubMed ({source})",
+                "Authors": ", ".join(r.get("AuthorList", [])) if "AuthorList" in r else "N/A"
+            }
+            if pmcid:
+                paper["PMCID"] = pmcid
+                paper["URL"] = f"https://pmc.ncbi.nlm.nih.gov/articles/{pmcid}/"
+            return paper
         except Exception as e:
-            print(f"PubMed Search Error: {e}")
-            print("Make sure 'biopython' is installed: pip install biopython")
-            return []
+            print(f"Error parsing PubMed record: {e}")
+            return None
+
+    # --- PubMed Central open-access full text ---
+
+    @staticmethod
+    def normalize_pmcid(value) -> str:
+        """
+        'PMC1234567' / 'pmc-id: PMC1234567;' / '1234567' -> 'PMC1234567' ('' if none).
+        """
+        match = re.search(r'(?:PMC)?(\d+)', str(value or ''), flags=re.IGNORECASE)
+        return f"PMC{match.group(1)}" if match else ""
+
+    def resolve_pmc(self, pmcid: str):
+        """
+        Look a PMCID up in the PMC open-access service.
+        Returns {"pdf_url", "package_url", "license"} for OA articles (pdf_url may be
+        None: most packages only ship a .tar.gz) or None when it is not in the OA subset.
+        Answers are cached; FTP links are rewritten to NCBI's equivalent HTTPS paths.
+        """
+        pmcid = self.normalize_pmcid(pmcid)
+        if not pmcid:
+            return None
+
+        entry = self.pmc_cache.get_entry(pmcid)
+        if entry is not None:
+            return entry["value"]
+
+        try:
+            with _ncbi_rate_limiter:
+                response = self.http.get(self.PMC_OA_URL, params={"id": pmcid}, timeout=15)
+            response.raise_for_status()
+            root = ET.fromstring(response.content)
+        except Exception as e:
+            print(f"PMC OA Error for {pmcid}: {e}")
+            return None  # Network trouble is not cached
+
+        record = root.find(".//record")
+        location = None
+        if record is not None:
+            links = {link.get("format"): re.sub(r'^ftp://', 'https://', link.get("href") or '')
+                     for link in record.findall("link")}
+            location = {
+                "pdf_url": links.get("pdf") or None,
+                "package_url": links.get("tgz") or None,
+                "license": record.get("license")
+            }
+        self.pmc_cache.set(pmcid, location, ttl=None if location else Config.PMC_OA_MISS_TTL)
+        return location
+
+    def fetch_pmc_xml(self, pmcid: str, output_path: str) -> str:
+        """
+        Save the JATS XML of a PMC article (efetch db=pmc) to output_path.
+        Returns the path, or None when the record carries no full-text body.
+        """
+        pmcid = self.normalize_pmcid(pmcid)
+        with _ncbi_rate_limiter:
+            handle = Entrez.efetch(db="pmc", id=pmcid[3:], retmode="xml")
+        try:
+            data = handle.read()
+        finally:
+            handle.close()
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        # Publishers outside the OA subset get a front-matter-only record
+        if b"<body" not in data:
+            return None
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(output_path, "wb") as f:
+            f.write(data)
+        return output_path
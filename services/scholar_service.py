@@ -1,9 +1,14 @@
 
-import time
 import urllib.parse
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import re
 
+from config import Config
+from services.metadata_resolver import MetadataResolver
+from services.challenge_queue import ChallengeQueue, KIND_SCHOLAR
+from services.domain_rules import HTML_PARSER
+from services.search_cache import SearchCache, get_search_cache
+
 try:
     import undetected_chromedriver as uc
     from selenium.webdriver.common.by import By
@@ -14,141 +19,215 @@ except ImportError:
     SELENIUM_AVAILABLE = False
 
 class ScholarService:
-    def __init__(self):
+    # Results per Scholar page; pages are addressed with start=0, 10, 20...
+    PAGE_SIZE = 10
+
+    def __init__(self, challenge_queue: ChallengeQueue = None, metadata_resolver: MetadataResolver = None,
+                 search_cache: SearchCache = None):
         self.base_url = "https://scholar.google.com/scholar"
+        # Unsolved CAPTCHAs are parked here instead of blocking the search
+        self.challenge_queue = challenge_queue or ChallengeQueue()
+        # Missing DOIs are filled in bulk (concurrent, cached, fuzzy-matched) after scraping
+        self.metadata = metadata_resolver or MetadataResolver()
+        # Finished searches are replayed without a browser (and without CAPTCHAs)
+        self.search_cache = search_cache or get_search_cache()
 
-    def search_papers(self, query: str, limit: int = 10) -> list:
+    @staticmethod
+    def _is_captcha(driver) -> bool:
+        url = driver.current_url
+        return "sorry" in url or "ipv4.google.com" in url
+
+    def _wait_for_captcha(self, driver) -> bool:
         """
-        Search Google Scholar using Selenium.
-        Ensure consistent keys in return dictionaries.
+        Give a human up to SCHOLAR_CAPTCHA_TIMEOUT seconds to solve the Google CAPTCHA,
+        checking the URL once per second. Returns False if it is still unsolved.
+        """
+        if not self._is_captcha(driver):
+            return True
+        print("⚠️  CAPTCHA detected! Please solve it.")
+        try:
+            WebDriverWait(driver, Config.SCHOLAR_CAPTCHA_TIMEOUT, poll_frequency=1).until(
+                lambda d: not self._is_captcha(d))
+            return True
+        except Exception:
+            return False
+
+    def _park(self, query: str, start: int, limit: int):
+        """
+        Queue the rest of the search (from result offset start) for the operator.
+        """
+        url = self._page_url(query, start)
+        print(f"⏸️ Scholar CAPTCHA not solved; parking the search at result {start}")
+        self.challenge_queue.add(url, kind=KIND_SCHOLAR, reason="captcha",
+                                 context={"query": query, "start": start, "limit": limit})
+
+    def _page_url(self, query: str, start: int) -> str:
+        params = {"q": query, "hl": "en"}
+        if start:
+            params["start"] = start
+        return f"{self.base_url}?{urllib.parse.urlencode(params)}"
+
+    @staticmethod
+    def _parse_entry(entry) -> dict:
+        """
+        Turn one result block into a paper dict with consistent keys.
+        """
+        # Initialize with defaults to avoid KeyErrors
+        res = {
+            'Title': 'N/A',
+            'DOI': 'N/A', 
+            'Publication_Year': 'N/A',
+            'Authors': 'N/A',
+            'Abstract': '',
+            'Source': 'Google Scholar',
+            'URL': 'N/A',
+            'PDF_Link': None
+        }
+        
+        # Title & Link Cleaning
+        title_tag = entry.find('h3', class_='gs_rt')
+        if title_tag:
+            # Remove standard [PDF], [HTML], [BOOK], [CITATION] tags and unbracketed HTML/PDF prefixes
+            raw_title = title_tag.text
+            # 1. Remove bracketed content like [HTML] or [PDF]
+            clean_title = re.sub(r'\[.*?\]', '', raw_title)
+            # 2. Remove leading "HTML" or "PDF" words that might remain (case insensitive)
+            clean_title = re.sub(r'^\s*(html|pdf|book|citation)\s+', '', clean_title, flags=re.IGNORECASE)
+            # 3. Double cleanup of spaces
+            clean_title = clean_title.strip()
+            res['Title'] = clean_title
+            
+            link_tag = title_tag.find('a')
+            if link_tag:
+                res['URL'] = link_tag['href']
+                
+                # Attempt to extract DOI from URL
+                # Common DOI pattern: 10.xxxx/yyyy
+                doi_match = re.search(r'(10\.\d{4,9}/[-._;()/:a-zA-Z0-9]+)', res['URL'])
+                if doi_match:
+                    res['DOI'] = doi_match.group(1)
+
+        # Metadata (Authors, Year, Source)
+        info_tag = entry.find('div', class_='gs_a')
+        if info_tag:
+            info_text = info_tag.text
+            parts = info_text.split(' - ')
+            if len(parts) > 0:
+                res['Authors'] = parts[0]
+                
+            # Extract year
+            year_match = re.search(r'\d{4}', info_text)
+            if year_match:
+                res['Publication_Year'] = year_match.group(0)
+
+        # Snippet under the metadata line: the closest thing to an abstract Scholar shows
+        snippet_tag = entry.find('div', class_='gs_rs')
+        if snippet_tag:
+            res['Abstract'] = re.sub(r'\s+', ' ', snippet_tag.get_text(' ')).strip()
+
+        # Direct PDF Link (Right side)
+        pdf_div = entry.find('div', class_='gs_or_ggsm')
+        if pdf_div:
+            pdf_a = pdf_div.find('a')
+            if pdf_a:
+                res['PDF_Link'] = pdf_a['href']
+                res['Source'] = "Google Scholar (Direct PDF)"
+        return res
+
+    def _parse_page(self, html: str) -> list:
+        """
+        Parse a results page once, building only the result blocks.
+        """
+        # Matched on the raw class string: the strainer runs before attributes are split
+        strainer = SoupStrainer('div', attrs={'class': re.compile(r'\bgs_r\b')})
+        soup = BeautifulSoup(html, HTML_PARSER, parse_only=strainer)
+        papers = []
+        for entry in soup.find_all('div', class_='gs_r gs_or gs_scl'):
+            try:
+                papers.append(self._parse_entry(entry))
+            except Exception as e:
+                print(f"Entry parsing error: {e}")
+        return papers
+
+    def iter_papers(self, query: str, limit: int = 10, start: int = 0, force_refresh: bool = False):
         """
+        Stream Google Scholar results page by page (Selenium, visible browser for CAPTCHAs).
+
+        Pages are loaded directly through the start= URL parameter and each page is parsed
+        once; its results are yielded as soon as their missing DOIs have been resolved, so
+        downloads can overlap with scraping. start skips that many results (used to resume
+        a parked search). A CAPTCHA that is not solved in time parks the remainder in the
+        challenge queue and ends the stream.
+        Complete searches from offset 0 are cached per query/limit and replayed from the
+        cache unless force_refresh is set.
+        """
+        if start == 0 and not force_refresh:
+            cached = self.search_cache.get("scholar", query, limit)
+            if cached is not None:
+                print(f"⚡ Using cached Google Scholar results for: {query} ({len(cached)} papers)")
+                yield from cached
+                return
+
         if not SELENIUM_AVAILABLE:
             print("❌ undetected-chromedriver not installed.")
-            return []
+            return
 
         print(f"Searching Google Scholar for: {query}")
-        results = []
-        
+        yielded = 0
+        collected = []
+        complete = False
+
         try:
             options = uc.ChromeOptions()
             # options.add_argument('--headless') # Keep visible for captcha
-            
+
             print("🚀 Launching browser...")
             driver = uc.Chrome(options=options)
-            
-            try:
-                params = {"q": query, "hl": "en"}
-                url = f"{self.base_url}?{urllib.parse.urlencode(params)}"
-                driver.get(url)
-                
+        except Exception as e:
+            print(f"Scholar Error: {e}")
+            return
+
+        try:
+            page_start = start
+            while yielded < limit:
+                driver.get(self._page_url(query, page_start))
+
                 # Manual Captcha Wait
-                while "sorry" in driver.current_url or "ipv4.google.com" in driver.current_url:
-                    print("⚠️  CAPTCHA detected! Please solve it.")
-                    time.sleep(5)
-                
-                WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.ID, "gs_res_ccl")))
-                
-                while len(results) < limit:
-                    soup = BeautifulSoup(driver.page_source, 'html.parser')
-                    entries = soup.find_all('div', class_='gs_r gs_or gs_scl')
-                    
-                    for entry in entries:
-                        if len(results) >= limit:
-                            break
-                        
-                        try:
-                            # Initialize with defaults to avoid KeyErrors
-                            res = {
-                                'Title': 'N/A',
-                                'DOI': 'N/A', 
-                                'Publication_Year': 'N/A',
-                                'Authors': 'N/A',
-                                'Source': 'Google Scholar',
-                                'URL': 'N/A',
-                                'PDF_Link': None
-                            }
-                            
-                            # Title & Link Cleaning
-                            title_tag = entry.find('h3', class_='gs_rt')
-                            if title_tag:
-                                # Remove standard [PDF], [HTML], [BOOK], [CITATION] tags and unbracketed HTML/PDF prefixes
-                                raw_title = title_tag.text
-                                # 1. Remove bracketed content like [HTML] or [PDF]
-                                clean_title = re.sub(r'\[.*?\]', '', raw_title)
-                                # 2. Remove leading "HTML" or "PDF" words that might remain (case insensitive)
-                                clean_title = re.sub(r'^\s*(html|pdf|book|citation)\s+', '', clean_title, flags=re.IGNORECASE)
-                                # 3. Double cleanup of spaces
-                                clean_title = clean_title.strip()
-                                res['Title'] = clean_title
-                                
-                                link_tag = title_tag.find('a')
-                                if link_tag:
-                                    res['URL'] = link_tag['href']
-                                    
-                                    # Attempt to extract DOI from URL
-                                    # Common DOI pattern: 10.xxxx/yyyy
-                                    doi_match = re.search(r'(10\.\d{4,9}/[-._;()/:a-zA-Z0-9]+)', res['URL'])
-                                    if doi_match:
-                                        res['DOI'] = doi_match.group(1)
-
-                            # Metadata (Authors, Year, Source)
-                            info_tag = entry.find('div', class_='gs_a')
-                            if info_tag:
-                                info_text = info_tag.text
-                                parts = info_text.split(' - ')
-                                if len(parts) > 0:
-                                    res['Authors'] = parts[0]
-                                    
-                                # Extract year
-                                year_match = re.search(r'\d{4}', info_text)
-                                if year_match:
-                                    res['Publication_Year'] = year_match.group(0)
-
-                            # Direct PDF Link (Right side)
-                            pdf_div = entry.find('div', class_='gs_or_ggsm')
-                            if pdf_div:
-                                pdf_a = pdf_div.find('a')
-                                if pdf_a:
-                                    res['PDF_Link'] = pdf_a['href']
-                                    res['Source'] = "Google Scholar (Direct PDF)"
-
-                            # If DOI is still missing, try to resolve via CrossRef using Title
-                            if res['DOI'] == 'N/A' and res['Title'] != 'N/A':
-                                try:
-                                    # Simple CrossRef Query (Public API)
-                                    import requests
-                                    # Polite pool: good practice to include email, but works without for low volume
-                                    cr_url = f"https://api.crossref.org/works?query.title={urllib.parse.quote(res['Title'])}&rows=1"
-                                    cr_resp = requests.get(cr_url, timeout=5)
-                                    if cr_resp.status_code == 200:
-                                        data = cr_resp.json()
-                                        if data['message']['items']:
-                                            # Check if title match is close enough could be good, but for now take top 1
-                                            found_doi = data['message']['items'][0].get('DOI')
-                                            if found_doi:
-                                                 res['DOI'] = found_doi
-                                except Exception:
-                                    pass # Fail silently on DOI resolution
-                                    
-                            results.append(res)
-                            
-                        except Exception as e:
-                            print(f"Entry parsing error: {e}")
-
-                    # Pagination
-                    if len(results) < limit:
-                        try:
-                            next_btn = driver.find_element(By.XPATH, "//b[contains(text(),'Next')]/..")
-                            next_btn.click()
-                            time.sleep(2)
-                            while "sorry" in driver.current_url:
-                                time.sleep(2)
-                        except:
-                            break
-            finally:
-                driver.quit()
-                
-            return results
+                if not self._wait_for_captcha(driver):
+                    self._park(query, page_start, limit - yielded)
+                    return
+                try:
+                    WebDriverWait(driver, 30, poll_frequency=0.1).until(
+                        EC.presence_of_element_located((By.ID, "gs_res_ccl")))
+                except Exception:
+                    print(f"Scholar: no result list at offset {page_start}")
+                    return
+
+                page = self._parse_page(driver.page_source)[:limit - yielded]
+                if not page:
+                    complete = True
+                    break
+                # If DOI is missing, resolve via CrossRef using Title (one concurrent batch per page)
+                self.metadata.fill_dois(page)
+                collected.extend(dict(res) for res in page)
+                for res in page:
+                    yielded += 1
+                    yield res
+                page_start += self.PAGE_SIZE
+            else:
+                complete = True
         except Exception as e:
             print(f"Scholar Error: {e}")
-            return []
+        finally:
+            driver.quit()
+
+        # Parked or failed searches are partial: only full result sets are cached
+        if complete and start == 0:
+            self.search_cache.set("scholar", query, limit, collected)
+
+    def search_papers(self, query: str, limit: int = 10, start: int = 0, force_refresh: bool = False) -> list:
+        """
+        Search Google Scholar using Selenium.
+        Ensure consistent keys in return dictionaries.
+        """
+        return list(self.iter_papers(query, limit=limit, start=start, force_refresh=force_refresh))
@@ -0,0 +1,222 @@
+import math
+import re
+from collections import Counter
+
+from config import Config
+
+METHOD_KEYWORDS = "keywords"
+METHOD_TFIDF = "tfidf"
+METHOD_LLM = "llm"
+METHODS = (METHOD_KEYWORDS, METHOD_TFIDF, METHOD_LLM)
+
+# Query syntax that is not content: boolean operators, and arXiv category filters
+# (cat:cs.LG never appears in a title or abstract)
+_OPERATORS = {"and", "or", "not", "andnot"}
+_SKIPPED_FIELDS = ("cat:",)
+# PubMed: 2020:2024[dp] date ranges, and term[tag] qualifiers. Terms tagged as authors,
+# dates, language, publication type or filters are dropped; content tags just lose the tag
+_PUBMED_DATE_RANGE = re.compile(r'"?[\d/]{4,10}"?\s*:\s*"?[\d/]{4,10}"?\s*\[[^\]]*\]')
+# An unquoted author term may carry initials: Smith J[au]
+_PUBMED_TAGGED = re.compile(r'("[^"]+"|[^\s()"\[\]]+(?:\s+[A-Z]{1,3}(?=\s*\[))?)\s*\[([^\]]*)\]')
+# Stands in for a dropped term so a NOT in front of it does not negate the next one
+_DROPPED = "\x00"
+_PUBMED_NON_CONTENT_TAGS = {
+    "au", "author", "1au", "lastau", "fau", "full author name", "ad", "affiliation",
+    "dp", "pdat", "publication date", "edat", "mhda", "crdt", "lr",
+    "la", "lang", "language", "pt", "publication type", "sb", "subset", "filter",
+    "ta", "journal", "so", "pmid", "uid", "doi", "lid", "aid", "vi", "ip", "pg"
+}
+_STOPWORDS = {
+    "a", "an", "the", "of", "in", "on", "for", "to", "and", "or", "with", "by", "from", "at", "as",
+    "is", "are", "be", "this", "that", "we", "our", "its", "it", "via", "using", "based", "into"
+}
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r'\s+', ' ', re.sub(r'[^\w\s]', ' ', str(text or '').lower())).strip()
+
+
+def _tokens(text: str) -> list:
+    return [t for t in _normalize(text).split() if len(t) > 1 and t not in _STOPWORDS]
+
+
+class ScreeningService:
+    """
+    Relevance screening of search hits before anything is downloaded.
+
+    Each paper is scored from its title and abstract against the review criteria
+    (by default the search query itself), on a 0..1 scale:
+      - keywords: share of criteria terms/phrases found (title hits count more)
+      - tfidf:    cosine similarity to the criteria over the hit set, relative to the best hit
+      - llm:      one batched LLM call per SCREENING_LLM_BATCH papers, scores 0-10
+    Papers below the threshold are dropped, or only moved to the end of the queue.
+    Papers with nothing to judge (no title, no abstract) are always kept.
+    """
+
+    TITLE_WEIGHT = 1.0
+    ABSTRACT_WEIGHT = 0.6
+
+    def __init__(self, analyzer=None):
+        # Only the LLM method needs the analyzer; created lazily to keep local screening dependency-free
+        self.analyzer = analyzer
+
+    @staticmethod
+    def criteria_terms(criteria: str) -> list:
+        """
+        'ti:"large language" AND abs:medicine ANDNOT cat:cs.CV' -> ['large language', 'medicine'],
+        '("deep learning"[Title/Abstract]) AND radiology[MeSH Terms]' -> ['deep learning', 'radiology'].
+        Quoted phrases stay whole; field prefixes/tags, operators, excluded terms and stopwords are dropped.
+        """
+        terms = []
+        negate = False
+        text = _PUBMED_DATE_RANGE.sub(f' {_DROPPED} ', str(criteria or ''))
+        text = _PUBMED_TAGGED.sub(
+            lambda m: f' {_DROPPED} ' if m.group(2).strip().lower() in _PUBMED_NON_CONTENT_TAGS else f' {m.group(1)} ', text)
+        text = re.sub(r'[()]', ' ', text)
+        for phrase, word in re.findall(r'(?:\w+:)?"([^"]+)"|(\S+)', text):
+            if not phrase and word.lower() in _OPERATORS:
+                negate = word.lower() in ("not", "andnot")
+                continue
+            if negate:
+                negate = False
+                continue
+            if word == _DROPPED or word.lower().startswith(_SKIPPED_FIELDS):
+                continue
+            if phrase:
+                value = _normalize(phrase)
+                if value:
+                    terms.append(value)
+            else:
+                terms.extend(_tokens(re.sub(r'^\w+:', '', word)))
+        return list(dict.fromkeys(terms))
+
+    @staticmethod
+    def _has_text(paper: dict) -> bool:
+        title = str(paper.get('Title') or '')
+        return bool(paper.get('Abstract')) or title not in ('', 'N/A', 'Unknown')
+
+    # --- Scorers: each returns one float (or None = cannot judge) per paper ---
+
+    def _score_keywords(self, papers: list, criteria: str) -> list:
+        terms = self.criteria_terms(criteria)
+        if not terms:
+            return [None] * len(papers)
+        scores = []
+        for paper in papers:
+            title = f" {_normalize(paper.get('Title'))} "
+            abstract = f" {_normalize(paper.get('Abstract'))} "
+            total = 0.0
+            for term in terms:
+                if f" {term} " in title:
+                    total += self.TITLE_WEIGHT
+                elif f" {term} " in abstract:
+                    total += self.ABSTRACT_WEIGHT
+            scores.append(total / len(terms))
+        return scores
+
+    def _score_tfidf(self, papers: list, criteria: str) -> list:
+        # The title is repeated so it weighs more than a long abstract
+        docs = [Counter(_tokens(f"{p.get('Title') or ''} {p.get('Title') or ''} {p.get('Abstract') or ''}"))
+                for p in papers]
+        query = Counter(t for term in self.criteria_terms(criteria) for t in term.split())
+        if not query:
+            return [None] * len(papers)
+        df = Counter(t for doc in docs for t in doc)
+        n = len(docs)
+
+        def _vector(counts):
+            return {t: (1 + math.log(c)) * (math.log((1 + n) / (1 + df[t])) + 1) for t, c in counts.items()}
+
+        q = _vector(query)
+        q_norm = math.sqrt(sum(v * v for v in q.values()))
+        raw = []
+        for doc in docs:
+            d = _vector(doc)
+            d_norm = math.sqrt(sum(v * v for v in d.values()))
+            dot = sum(w * d.get(t, 0.0) for t, w in q.items())
+            raw.append(dot / (q_norm * d_norm) if d_norm else 0.0)
+        best = max(raw) if raw else 0.0
+        return [r / best if best else 0.0 for r in raw]
+
+    def _score_llm(self, papers: list, criteria: str, model: str, provider: str) -> list:
+        if self.analyzer is None:
+            from services.analyzer_service import AnalyzerService
+            self.analyzer = AnalyzerService()
+
+        system_msg = "You screen search results for a systematic literature review. Be strict but fair."
+        batch = max(1, Config.SCREENING_LLM_BATCH)
+        scores = [None] * len(papers)
+        for offset in range(0, len(papers), batch):
+            chunk = papers[offset:offset + batch]
+            listing = "\n\n".join(
+                f"[{i + 1}] {p.get('Title') or 'N/A'}\n{str(p.get('Abstract') or '(no abstract)')[:Config.SCREENING_ABSTRACT_CHARS]}"
+                for i, p in enumerate(chunk)
+            )
+            user_msg = f"""Rate how relevant each paper is to the review criteria below, from 0 (unrelated) to 10 (exactly on topic).
+
+REVIEW CRITERIA:
+{criteria}
+
+PAPERS:
+{listing}
+
+Respond with JSON: {{"scores": {{"1": <0-10>, "2": <0-10>, ...}}}} with one entry per paper number."""
+            answer = self.analyzer.complete_json(system_msg, user_msg, model=model, provider=provider)
+            if "error" in answer:
+                print(f"⚠️ LLM screening failed ({answer['error']}); using keyword scores for this batch")
+                scores[offset:offset + len(chunk)] = self._score_keywords(chunk, criteria)
+                continue
+            rated = answer.get("scores", answer)
+            for i in range(len(chunk)):
+                try:
+                    scores[offset + i] = min(max(float(rated[str(i + 1)]) / 10.0, 0.0), 1.0)
+                except (KeyError, TypeError, ValueError):
+                    pass  # Unrated papers are kept
+        return scores
+
+    def score(self, papers: list, criteria: str, method: str = None, model: str = "gpt-4o-mini",
+              provider: str = "openai") -> list:
+        """
+        Set paper["Relevance"] (0..1, or None when it cannot be judged) and return the scores.
+        """
+        method = method or Config.SCREENING_METHOD
+        if method not in METHODS:
+            raise ValueError(f"Unknown screening method '{method}' (expected one of {', '.join(METHODS)})")
+        judged = [p for p in papers if self._has_text(p)]
+        if method == METHOD_LLM:
+            scores = self._score_llm(judged, criteria, model, provider)
+        elif method == METHOD_TFIDF:
+            scores = self._score_tfidf(judged, criteria)
+        else:
+            scores = self._score_keywords(judged, criteria)
+
+        by_id = {id(p): s for p, s in zip(judged, scores)}
+        for paper in papers:
+            s = by_id.get(id(paper))
+            paper["Relevance"] = None if s is None else round(s, 3)
+        return [p["Relevance"] for p in papers]
+
+    def screen(self, papers: list, criteria: str, method: str = None, threshold: float = None,
+               drop: bool = True, model: str = "gpt-4o-mini", provider: str = "openai") -> tuple:
+        """
+        Score papers and split them at the threshold.
+        Returns (kept, dropped): kept is ordered by relevance (unjudged papers rank at the
+        threshold). With drop=False nothing is dropped; low-relevance papers just go last.
+        """
+        threshold = Config.SCREENING_THRESHOLD if threshold is None else threshold
+        papers = list(papers)
+        if not papers:
+            return [], []
+        self.score(papers, criteria, method=method, model=model, provider=provider)
+
+        def _rank(paper):
+            return threshold if paper["Relevance"] is None else paper["Relevance"]
+
+        # sorted() is stable: ties keep the source's own ranking
+        ranked = sorted(papers, key=_rank, reverse=True)
+        if not drop:
+            return ranked, []
+        kept = [p for p in ranked if _rank(p) >= threshold]
+        dropped = [p for p in ranked if _rank(p) < threshold]
+        print(f"🎯 Screening ({method or Config.SCREENING_METHOD}): kept {len(kept)}/{len(papers)} papers")
+        return kept, dropped
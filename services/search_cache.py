@@ -0,0 +1,58 @@
+import copy
+import os
+import re
+
+from config import Config
+from utils.json_store import TTLCache
+
+
+class SearchCache:
+    """
+    Persistent cache of search results keyed by (source, normalized query, limit).
+
+    Re-running a query while tuning extraction fields then costs no arXiv / NCBI
+    request and, for Scholar, no browser or CAPTCHA. Empty result lists are not
+    stored, so a transient failure is retried on the next run. SEARCH_CACHE_TTL=0 disables it.
+    Results go in and come out as copies: callers mark papers in place ('Crawled',
+    'PDF_Link', 'Relevance') and those per-run fields must not end up in the cache.
+    """
+
+    def __init__(self, path: str = None, ttl: float = None):
+        self.cache = TTLCache(
+            path or os.path.join(Config.CACHE_DIR, "search_cache.json"),
+            Config.SEARCH_CACHE_TTL if ttl is None else ttl
+        )
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        # Only whitespace is folded: case and operators can change what a source returns
+        return re.sub(r'\s+', ' ', str(query or '')).strip()
+
+    def _key(self, source: str, query: str, limit: int) -> str:
+        return f"{source}|{self.normalize_query(query)}|{int(limit)}"
+
+    def get(self, source: str, query: str, limit: int):
+        """
+        Cached result list, or None on a miss / expired entry.
+        """
+        if self.cache.ttl <= 0:
+            return None
+        return copy.deepcopy(self.cache.get(self._key(source, query, limit)))
+
+    def set(self, source: str, query: str, limit: int, results: list):
+        if results and self.cache.ttl > 0:
+            self.cache.set(self._key(source, query, limit), copy.deepcopy(results))
+
+
+_shared_cache = None
+
+
+def get_search_cache() -> SearchCache:
+    """
+    Process-wide SearchCache: services share one instance so their writes to the
+    single JSON file never overwrite each other.
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = SearchCache()
+    return _shared_cache
@@ -0,0 +1,115 @@
+import os
+import random
+
+from config import Config
+from utils.concurrency import HostLimiter
+from utils.json_store import JsonStore
+
+
+class StrategyStats:
+    """
+    Persistent success rates and latencies of download strategies,
+    tracked per landing-page domain and per search source.
+
+    Used by DownloaderService.download_paper to run the cheapest strategy likely
+    to succeed first, and to skip strategies that never work on a domain.
+    """
+
+    def __init__(self, path: str = None):
+        self.store = JsonStore(path or os.path.join(Config.CACHE_DIR, "strategy_stats.json"))
+
+    @staticmethod
+    def domain_of(paper: dict) -> str:
+        url = paper.get('URL') or paper.get('PDF_Link') or ''
+        host = HostLimiter.host_of(str(url)) if str(url).startswith('http') else ''
+        return host[4:] if host.startswith('www.') else host
+
+    @staticmethod
+    def source_of(paper: dict) -> str:
+        # "Google Scholar (Direct PDF)" -> "Google Scholar", "PubMed (Nature)" -> "PubMed"
+        return str(paper.get('Source') or '').split(' (')[0].strip()
+
+    def _scopes(self, paper: dict) -> list:
+        scopes = []
+        domain = self.domain_of(paper)
+        if domain:
+            scopes.append(f"domain:{domain}")
+        source = self.source_of(paper)
+        if source:
+            scopes.append(f"source:{source}")
+        return scopes
+
+    def record(self, paper: dict, strategy: str, success: bool, seconds: float):
+        updates = {}
+        for scope in self._scopes(paper):
+            key = f"{scope}|{strategy}"
+            entry = dict(self.store.get(key) or {"attempts": 0, "successes": 0, "seconds": 0.0})
+            entry["attempts"] += 1
+            entry["successes"] += int(bool(success))
+            entry["seconds"] += seconds
+            updates[key] = entry
+        if updates:
+            self.store.update(updates)
+
+    def get(self, paper: dict, strategy: str):
+        """
+        Most specific stats with enough samples: domain first, then source.
+        """
+        for scope in self._scopes(paper):
+            entry = self.store.get(f"{scope}|{strategy}")
+            if entry and entry["attempts"] >= Config.STRATEGY_MIN_SAMPLES:
+                return scope, entry
+        return None, None
+
+    @staticmethod
+    def expected_cost(entry: dict) -> float:
+        """
+        Expected seconds spent per successful download: mean latency / success rate
+        (Laplace-smoothed so a couple of failures don't make a strategy look hopeless).
+        """
+        mean_latency = entry["seconds"] / entry["attempts"]
+        success_rate = (entry["successes"] + 1) / (entry["attempts"] + 2)
+        return mean_latency / success_rate
+
+    def order(self, paper: dict, strategies: list) -> list:
+        """
+        Reorder (name, callable) strategies by expected cost.
+
+        Strategies without enough data keep their configured slot; the ones with data
+        are sorted among the remaining slots. A strategy that has never succeeded on this
+        domain after STRATEGY_SKIP_AFTER attempts is dropped, except for an occasional
+        re-probe (STRATEGY_EXPLORE_RATE) so a publisher that changes its site is noticed.
+        """
+        kept = []
+        costs = {}
+        for name, fn in strategies:
+            scope, entry = self.get(paper, name)
+            if entry is not None:
+                never_works = entry["successes"] == 0 and entry["attempts"] >= Config.STRATEGY_SKIP_AFTER
+                if never_works and scope.startswith("domain:") and random.random() >= Config.STRATEGY_EXPLORE_RATE:
+                    print(f"   ⏭ Skipping '{name}' on {scope[7:]} (0/{entry['attempts']} successes)")
+                    continue
+                costs[name] = self.expected_cost(entry)
+            kept.append((name, fn))
+
+        slots = [i for i, (name, _) in enumerate(kept) if name in costs]
+        ranked = sorted((kept[i] for i in slots), key=lambda s: costs[s[0]])
+        for i, strategy in zip(slots, ranked):
+            kept[i] = strategy
+        return kept
+
+    def summary(self) -> list:
+        """
+        Rows for display: scope, strategy, attempts, success rate, mean latency.
+        """
+        rows = []
+        for key, entry in self.store.items():
+            scope, strategy = key.rsplit('|', 1)
+            rows.append({
+                "Scope": scope,
+                "Strategy": strategy,
+                "Attempts": entry["attempts"],
+                "Success_Rate": round(entry["successes"] / entry["attempts"], 2) if entry["attempts"] else 0,
+                "Mean_Seconds": round(entry["seconds"] / entry["attempts"], 2) if entry["attempts"] else 0
+            })
+        return rows
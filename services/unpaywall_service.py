@@ -0,0 +1,87 @@
+import os
+import urllib.parse
+
+from config import Config
+from services.http_client import get_http_client
+from services.pdf_store import normalize_doi
+from utils.json_store import TTLCache
+
+
+class UnpaywallService:
+    """
+    Lightweight DOI -> open-access location resolver (Unpaywall REST API).
+
+    Goes through the shared pooled HTTP client and keeps every answer, including
+    "no OA copy", in a persistent cache so repeat runs resolve without a request.
+    """
+
+    API_URL = "https://api.unpaywall.org/v2/{doi}"
+    _warned_no_email = False
+
+    def __init__(self, email: str = None, http_client=None, cache: TTLCache = None):
+        self.email = email or Config.UNPAYWALL_EMAIL
+        self.http = http_client or get_http_client()
+        self.cache = cache or TTLCache(os.path.join(Config.CACHE_DIR, "unpaywall.json"),
+                                       Config.UNPAYWALL_CACHE_TTL)
+
+    @staticmethod
+    def _pick_location(data: dict) -> dict:
+        """
+        Best location with a direct PDF, falling back to any OA location.
+        """
+        best = data.get("best_oa_location") or {}
+        locations = [best] + [loc for loc in (data.get("oa_locations") or []) if loc and loc is not best]
+        for loc in locations:
+            if loc.get("url_for_pdf"):
+                return loc
+        return best or None
+
+    def resolve(self, doi: str):
+        """
+        Return {"pdf_url", "landing_url", "host_type", "version", "license"} or None
+        when the DOI has no open-access copy (or Unpaywall does not know it).
+        Without a contact email (UNPAYWALL_EMAIL) no request is made and None is returned.
+        """
+        doi = normalize_doi(doi)
+        if not doi:
+            return None
+        if not self.email:
+            if not UnpaywallService._warned_no_email:
+                UnpaywallService._warned_no_email = True
+                print("⚠️ UNPAYWALL_EMAIL is not set; skipping Unpaywall lookups")
+            return None
+
+        entry = self.cache.get_entry(doi)
+        if entry is not None:
+            return entry["value"]
+
+        url = self.API_URL.format(doi=urllib.parse.quote(doi, safe='/'))
+        try:
+            response = self.http.get(url, params={"email": self.email}, timeout=15)
+        except Exception as e:
+            print(f"Unpaywall Error for {doi}: {e}")
+            return None  # Network trouble is not cached
+
+        if response.status_code == 404:
+            self.cache.set(doi, None, ttl=Config.UNPAYWALL_MISS_TTL)
+            return None
+        if response.status_code != 200:
+            print(f"Unpaywall HTTP {response.status_code} for {doi}")
+            return None
+
+        loc = self._pick_location(response.json()) if response.content else None
+        location = None
+        if loc:
+            location = {
+                "pdf_url": loc.get("url_for_pdf"),
+                "landing_url": loc.get("url_for_landing_page") or loc.get("url"),
+                "host_type": loc.get("host_type"),
+                "version": loc.get("version"),
+                "license": loc.get("license")
+            }
+        self.cache.set(doi, location, ttl=None if location else Config.UNPAYWALL_MISS_TTL)
+        return location
+
+    def resolve_pdf_url(self, doi: str):
+        location = self.resolve(doi)
+        return location.get("pdf_url") if location else None
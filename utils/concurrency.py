@@ -0,0 +1,92 @@
+import threading
+import time
+import urllib.parse
+from contextlib import contextmanager
+
+
+class HostLimiter:
+    """
+    Caps the number of simultaneous operations against the same host.
+    One semaphore is created lazily per netloc. With min_interval, consecutive
+    operations on a host are also spaced at least that many seconds apart.
+    """
+
+    def __init__(self, per_host: int = 2, min_interval: float = 0):
+        self.per_host = max(1, int(per_host))
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._semaphores = {}
+        self._next_start = {}
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        """
+        Return the lowercase netloc of a URL ('' if it cannot be parsed).
+        """
+        try:
+            return urllib.parse.urlparse(url).netloc.lower()
+        except Exception:
+            return ""
+
+    def _semaphore(self, host: str) -> threading.Semaphore:
+        with self._lock:
+            sem = self._semaphores.get(host)
+            if sem is None:
+                sem = threading.BoundedSemaphore(self.per_host)
+                self._semaphores[host] = sem
+            return sem
+
+    @contextmanager
+    def limit(self, url: str):
+        """
+        Context manager that holds one slot for the URL's host.
+        """
+        host = self.host_of(url)
+        sem = self._semaphore(host)
+        sem.acquire()
+        try:
+            if self.min_interval:
+                with self._lock:
+                    now = time.monotonic()
+                    start = max(now, self._next_start.get(host, now))
+                    self._next_start[host] = start + self.min_interval
+                if start > now:
+                    time.sleep(start - now)
+            yield
+        finally:
+            sem.release()
+
+
+class RateLimiter:
+    """
+    Token bucket shared by threads: at most rate calls per second on average,
+    with bursts of up to burst calls. acquire() blocks until a token is free.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        return False
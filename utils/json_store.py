@@ -0,0 +1,121 @@
+import json
+import os
+import threading
+import time
+
+
+class JsonStore:
+    """
+    Small thread-safe key/value store persisted as a single JSON file.
+    Writes go to a temporary file first and are swapped in with os.replace,
+    so a crash never leaves a half-written index behind.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self._data = self._load()
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except Exception as e:
+            print(f"⚠️ Could not read {self.path} ({e}). Starting empty.")
+            return {}
+
+    def save(self):
+        with self._lock:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            return self._data.get(key, default)
+
+    def set(self, key: str, value, save: bool = True):
+        with self._lock:
+            self._data[key] = value
+            if save:
+                self.save()
+
+    def update(self, mapping: dict, save: bool = True):
+        with self._lock:
+            self._data.update(mapping)
+            if save:
+                self.save()
+
+    def delete(self, key: str, save: bool = True):
+        with self._lock:
+            if self._data.pop(key, None) is not None and save:
+                self.save()
+
+    def items(self) -> list:
+        with self._lock:
+            return list(self._data.items())
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class TTLCache(JsonStore):
+    """
+    JsonStore whose entries expire a given number of seconds after being written.
+    Each record is stored as {"value": ..., "stored_at": ts, "expires_at": ts}.
+    Expired records are dropped on load and before every write, so the file only
+    holds live entries.
+    """
+
+    def __init__(self, path: str, ttl: float):
+        super().__init__(path)
+        self.ttl = ttl
+        if self._drop_expired():
+            self.save()
+
+    def _drop_expired(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [k for k, v in self._data.items()
+                       if isinstance(v, dict) and v.get("expires_at") is not None and v["expires_at"] < now]
+            for k in expired:
+                del self._data[k]
+        return len(expired)
+
+    def get_entry(self, key: str):
+        """
+        Return the raw record (value + timestamps) or None if missing/expired.
+        """
+        entry = super().get(key)
+        if not isinstance(entry, dict) or "value" not in entry:
+            return None
+        expires_at = entry.get("expires_at")
+        if expires_at is not None and expires_at < time.time():
+            self.delete(key)
+            return None
+        return entry
+
+    def get(self, key: str, default=None):
+        entry = self.get_entry(key)
+        return default if entry is None else entry["value"]
+
+    def set(self, key: str, value, ttl: float = None, save: bool = True):
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        self._drop_expired()
+        super().set(key, {
+            "value": value,
+            "stored_at": now,
+            "expires_at": now + ttl if ttl else None
+        }, save=save)